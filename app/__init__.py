@@ -5,17 +5,33 @@ from .controllers.rentals import bp as rentals_bp
 from .controllers.staff import bp as admin_bp
 from .controllers.views import bp as views_bp
 from .models.store import Store
+from .utils.constants import ROLE_DASHBOARDS
 from .utils.filters import fmt_iso_local
 
+# Each blueprint module is imported once and registered exactly once;
+# Flask raises ValueError if a blueprint name is registered twice.
+BLUEPRINTS = (auth_bp, views_bp, rentals_bp, admin_bp)
+
 
 def create_app():
     app = Flask(__name__, static_folder="static", template_folder="templates")
     app.config["SECRET_KEY"] = "dev-secret-change-me"
-    Store.instance()  # load data.pkl or init default
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(views_bp)
-    app.register_blueprint(rentals_bp)
-    app.register_blueprint(admin_bp)
+    # Unbounded template cache (set before jinja_env is first built): compiled templates are never evicted
+    app.jinja_options = {**app.jinja_options, "cache_size": -1}
+    Store.instance()  # load data.pkl or init default; later calls hit the lock-free fast path
+    for bp in BLUEPRINTS:
+        app.register_blueprint(bp)
+
+    # Fail fast at startup instead of guarding every login redirect
+    missing = [ep for ep in ROLE_DASHBOARDS.values() if ep not in app.view_functions]
+    if missing:
+        raise RuntimeError(f"Dashboard endpoints not registered: {', '.join(missing)}")
+
     app.jinja_env.filters["fmt_iso_local"] = fmt_iso_local
 
+    # Compile every template once at startup (after custom filters exist) so the
+    # first request per template is a cache lookup instead of a parse + compile
+    for name in app.jinja_env.list_templates(extensions=("html",)):
+        app.jinja_env.get_template(name)
+
     return app
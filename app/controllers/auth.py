@@ -1,16 +1,47 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
-from ..exceptions import VehicleNotFoundError, RentalNotFoundError
 
 from ..models.store import Store
+from ..utils.constants import CUSTOMER_ROLES
 from ..utils.security import generate_hash, check_hash
-import re
+from ..utils.urls import dashboard_url, login_url
 
 bp = Blueprint("auth", __name__, url_prefix="/")
 
-# Compile once at module import
+# Compile once at module import; handlers must call PATTERN.match() directly
+# instead of re.match(r"...") so the pattern is never re-parsed per request.
 PASSWORD_PATTERN = re.compile(r"^(?=.*[a-z])(?=.*[A-Z])(?=.*\d).{6,}$")
 USERNAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{3,10}$")  # tweak as needed
 
+# Bounded LRU of recently verified logins: (username, sha256(password + stored hash)) -> renter_id.
+# The stored hash is part of the key, so a password change never matches an old entry.
+_VERIFY_CACHE_MAX = 1024
+_verify_cache: "OrderedDict[tuple[str, str], str]" = OrderedDict()
+_verify_lock = threading.Lock()
+
+
+def _verify_password(username: str, password: str, user: dict) -> bool:
+    """Check a password, skipping the slow KDF for repeat logins already verified."""
+    stored = user["password_hash"]
+    key = (username, hashlib.sha256((password + stored).encode()).hexdigest())
+    with _verify_lock:
+        if key in _verify_cache:
+            _verify_cache.move_to_end(key)
+            return True
+
+    if not check_hash(password, stored):
+        return False
+
+    with _verify_lock:
+        _verify_cache[key] = user["renter_id"]
+        while len(_verify_cache) > _VERIFY_CACHE_MAX:
+            _verify_cache.popitem(last=False)
+    return True
+
 
 @bp.get("register")
 def register_form():
@@ -28,7 +59,8 @@ def register_submit():
         flash("Username and password are required.", "danger")
         return redirect(url_for("auth.register_form"))
 
-    if role not in ("corporate", "individual"):
+    # Visitors may self-register as customers only (staff accounts are created by staff)
+    if role not in CUSTOMER_ROLES:
         flash("Invalid role.", "danger")
         return redirect(url_for("auth.register_form"))
 
@@ -54,7 +86,7 @@ def register_submit():
 
     store.create_user(username=username, password_hash=generate_hash(password), role=role)
     flash("Registration successful. Please login.", "success")
-    return redirect(url_for("auth.login_form"))
+    return redirect(login_url())
 
 
 @bp.get("login")
@@ -69,30 +101,20 @@ def login_submit():
     store = Store.instance()
     user = store.find_user(username)
 
-    if not user or not check_hash(password, user["password_hash"]):
+    if not user or not _verify_password(username, password, user):
         flash("Invalid credentials")
-        return redirect(url_for("auth.login_form"))
+        return redirect(login_url())
 
-    session["user_id"] = user["renter_id"]
-    session["_user_id"] = user["renter_id"]
-    session["uid"] = user["renter_id"]
+    session["uid"] = user["renter_id"]  # single canonical id key; read via current_uid()
     session["role"] = user["role"]
     session["username"] = user["username"]
 
-    dest = {
-        "staff": "views.staff_dashboard",
-        "corporate": "views.corporate_dashboard",
-        "individual": "views.individual_dashboard",
-    }.get(user["role"], "views.individual_dashboard")
-
-    try:
-        return redirect(url_for(dest))
-    except Exception:
-        return redirect(url_for("home"))
+    # Dashboard endpoints are validated once in create_app(), so no fallback is needed here
+    return redirect(dashboard_url(user["role"]))
 
 
 @bp.get("logout")
 def logout():
     session.clear()
     flash("Logged out")
-    return redirect(url_for("auth.login_form"))
+    return redirect(login_url())
@@ -1,32 +1,66 @@
+from operator import itemgetter
+
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
 from ..exceptions import VehicleNotFoundError, RentalNotFoundError
 
 from ..services.rental_service import RentalService
 from ..services.vehicle_service import VehicleService
+from ..utils.caching import conditional_render
 from ..utils.decorators import login_required
-from app.services.common import Store  # <-- make sure this import path is correct
+from ..utils.security import current_uid
+from ..utils.urls import dashboard_url
+from app.services.common import Store, to_float_safe  # <-- make sure this import path is correct
 
 bp = Blueprint("rentals", __name__, url_prefix="/")
 
+# Rental statuses shown on the vehicle detail calendar
+_VISIBLE_STATUSES = frozenset({"rented", "reserved", "overdue", "returned"})
+
+
+def _iso_day(value) -> str:
+    """Return the YYYY-MM-DD part of an ISO date/datetime string ('' if missing)."""
+    return value[:10] if value else ""
+
 
 @bp.get("/vehicles")
 @login_required
 def list_vehicles():
     """Vehicles list with filters. Strip empty query params and redirect to a clean URL."""
-    q = {k: (v or "").strip() for k, v in request.args.items()}
-    nonempty = {k: v for k, v in q.items() if v}
-
-    # If URL has only empty params, redirect to /vehicles without ?brand=&type=...
-    if request.args and not nonempty:
+    args = request.args
+    nonempty = {}
+    if args:
+        # Single pass: strip values and keep the non-empty ones
+        for k, v in args.items():
+            v = (v or "").strip()
+            if v:
+                nonempty[k] = v
+
+        # If URL has only empty params, redirect to /vehicles without ?brand=&type=...
+        if not nonempty:
+            return redirect(url_for("rentals.list_vehicles"))
+
+    # Parse the price range once here so the service receives floats (or None)
+    min_rate = to_float_safe(nonempty.get("min"))
+    max_rate = to_float_safe(nonempty.get("max"))
+    if ("min" in nonempty and min_rate is None) or ("max" in nonempty and max_rate is None):
+        flash("Invalid price range", "danger")
         return redirect(url_for("rentals.list_vehicles"))
 
-    vehicles = VehicleService.filter_vehicles(
-        vtype=nonempty.get("type"),
-        brand=nonempty.get("brand"),
-        min_rate=nonempty.get("min"),
-        max_rate=nonempty.get("max"),
-    )
-    return render_template("vehicles/vehicles.html", vehicles=vehicles)
+    def build_context():
+        vehicles = VehicleService.filter_vehicles(
+            vtype=nonempty.get("type"),
+            brand=nonempty.get("brand"),
+            min_rate=min_rate,
+            max_rate=max_rate,
+        )
+        # The form echoes the normalized filters (never raw request.args), so pages cached
+        # under the normalized key are identical for every query that maps to it
+        return {"vehicles": vehicles, "filters": nonempty}
+
+    # Conditional GET: unchanged store + same filters -> 304 without filtering or rendering;
+    # other tabs/clients of the same user reuse the server-side rendered page
+    etag_parts = (Store.instance().version, "vehicles", tuple(sorted(nonempty.items())))
+    return conditional_render("vehicles/vehicles.html", etag_parts, build_context, server_cache=True)
 
 
 @bp.get("/vehicles/<vid>")
@@ -43,48 +77,49 @@ def vehicle_detail(vid):
         flash("Vehicle not found", "danger")
         return redirect(url_for("rentals.list_vehicles"))
 
-    # 2) Who is the current user?
-    is_staff = session.get("role") == "staff"
-    me_id = session.get("renter_id") or session.get("user_id")
-
-    # 3) Access the shared store
+    # 2) Access the shared store; an unchanged store version means an unchanged page
     store = Store.instance()
 
-    # 4) Collect rentals for this vehicle (adjust statuses if needed)
-    rentals = []
-    for r in store.rentals.values():
-        if r.get("vehicle_id") != vid:
-            continue
-        if r.get("status") not in ("rented", "reserved", "overdue", "returned"):
-            continue
-        rentals.append(r)
-
-    # 5) Enrich with renter username
-    calendar = []
-    for r in sorted(rentals, key=lambda x: (x.get("start_date") or "")):
-        rid = r.get("renter_id")
-        rname = r.get("renter_username")
-        if not rname and rid in store.users:
-            rname = store.users[rid].get("username")
-
-        item = {
-            "start": (r.get("start_date") or "")[:10],
-            "end": (r.get("end_date") or "")[:10],
-            "renter_id": rid,
-            "renter_username": rname,
-        }
-
-        # Staff see all; non-staff see only their own
-        if is_staff or (me_id and rid == me_id):
-            calendar.append(item)
-
-    # 6) Fallback to service calendar if nothing enriched (keeps JS blocking working)
-    if not calendar:
-        simple = VehicleService.availability_calendar(vid) or []
-        calendar = [{"start": s[:10], "end": e[:10], "renter_id": None, "renter_username": None}
-                    for (s, e) in simple]
-
-    return render_template("vehicles/vehicle_detail.html", v=v, calendar=calendar)
+    def build_context():
+        # 3) Who is the current user?
+        is_staff = session.get("role") == "staff"
+        me_id = current_uid()
+
+        # 4) Collect rentals for this vehicle via the vehicle index (adjust statuses if needed)
+        rentals = [r for r in store.rentals_for_vehicle(vid)
+                   if r.get("status") in _VISIBLE_STATUSES]
+
+        # 5) Enrich with renter username, resolving each distinct renter once
+        users = store.users
+        name_map = {i: users[i].get("username") for i in {r.get("renter_id") for r in rentals} if i in users}
+        calendar = []
+        for r in rentals:
+            rid = r.get("renter_id")
+            rname = r.get("renter_username") or name_map.get(rid)
+
+            item = {
+                "start": _iso_day(r.get("start_date")),
+                "end": _iso_day(r.get("end_date")),
+                "renter_id": rid,
+                "renter_username": rname,
+            }
+
+            # Staff see all; non-staff see only their own
+            if is_staff or (me_id and rid == me_id):
+                calendar.append(item)
+
+        # Sort the (already filtered) rows once on the pre-sliced start day; itemgetter runs in C
+        calendar.sort(key=itemgetter("start"))
+
+        # 6) Fallback to service calendar if nothing enriched (keeps JS blocking working)
+        if not calendar:
+            simple = VehicleService.availability_calendar(vid) or []
+            calendar = [{"start": _iso_day(s), "end": _iso_day(e), "renter_id": None, "renter_username": None}
+                        for (s, e) in simple]
+
+        return {"v": v, "calendar": calendar}
+
+    return conditional_render("vehicles/vehicle_detail.html", (store.version, "vehicle", vid), build_context)
 
 
 @bp.post("/rent")
@@ -92,15 +127,16 @@ def vehicle_detail(vid):
 def rent_vehicle():
     """Create a rental for current user if dates are valid and non-overlapping."""
     form = request.form
+    vid = form.get("vehicle_id")
     ok, msg, rid = RentalService.rent(
-        renter_id=session.get("uid"),
-        vehicle_id=form.get("vehicle_id"),
+        renter_id=current_uid(),
+        vehicle_id=vid,
         start=form.get("start_date"),
         end=form.get("end_date"),
     )
     if not ok:
         flash(msg)
-        return redirect(url_for("rentals.vehicle_detail", vid=form.get("vehicle_id")))
+        return redirect(url_for("rentals.vehicle_detail", vid=vid))
     flash("Rental created")
     return redirect(url_for("rentals.invoice", rid=rid))
 
@@ -110,11 +146,9 @@ def rent_vehicle():
 def cancel_rental():
     """Cancel a rental before it starts. Only renter or staff can do this."""
     rid = request.form.get("rental_id")
-    uid = session.get("uid")
-    role = session.get("role")
-    is_staff = (role == "staff")
+    is_staff = session.get("role") == "staff"
 
-    ok, msg = RentalService.cancel_rental(rid, requester_id=uid, is_staff=is_staff)
+    ok, msg = RentalService.cancel_rental(rid, requester_id=current_uid(), is_staff=is_staff)
     flash(msg)
 
     return redirect(url_for("rentals.list_vehicles"))
@@ -135,26 +169,14 @@ def invoice(rid):
 @login_required
 def return_submit():
     """Handle vehicle return from dashboards form."""
+    # Return to the corresponding dashboard of the current user
+    dest = dashboard_url(session.get("role"))
+
     rid = (request.form.get("rental_id") or "").strip()
     if not rid:
         flash("Missing rental id", "danger")
-        # Return to the corresponding dashboard of the current user
-        role = session.get("role")
-        dest = {
-            "staff": "views.staff_dashboard",
-            "corporate": "views.corporate_dashboard",
-            "individual": "views.individual_dashboard",
-        }.get(role, "views.individual_dashboard")
-        return redirect(url_for(dest))
+        return redirect(dest)
 
     ok, msg = RentalService.return_vehicle(rid)
     flash(msg, "success" if ok else "danger")
-
-    # Return to the corresponding dashboard of the current user
-    role = session.get("role")
-    dest = {
-        "staff": "views.staff_dashboard",
-        "corporate": "views.corporate_dashboard",
-        "individual": "views.individual_dashboard",
-    }.get(role, "views.individual_dashboard")
-    return redirect(url_for(dest))
+    return redirect(dest)
@@ -1,17 +1,13 @@
 from __future__ import annotations
 
-import uuid
-from urllib import request
-
-from flask import Blueprint
-from flask import request, render_template, redirect, url_for, flash
+from flask import Blueprint, request, render_template, redirect, url_for, flash
 
 from ..services.analytics_service import AnalyticsService
 from ..services.common import _store
 from ..services.user_service import UserService
 from ..services.vehicle_service import VehicleService
+from ..utils.constants import CUSTOMER_ROLES
 from ..utils.decorators import login_required, role_required
-from app.services.common import _store
 
 bp = Blueprint("staff", __name__, url_prefix="/staff")
 
@@ -49,17 +45,8 @@ def staff_vehicles():
 @bp.post("/vehicles/add")
 def staff_add_vehicle():
     """Add a new vehicle (staff only)."""
-    data = {
-        "vehicle_id": str(uuid.uuid4())[:8],
-        "brand": request.form.get("brand", "").strip(),
-        "model": request.form.get("model", "").strip(),
-        "type": request.form.get("type", "").lower().strip(),
-        "rate": float(request.form.get("rate") or 0),
-        "status": "available",
-        "image_path": request.form.get("image_path", "").strip(),
-    }
-
-    ok, msg, _ = VehicleService.admin_create_vehicle(data)
+    # The service normalizes the form fields itself and the store assigns the id
+    ok, msg, _ = VehicleService.admin_create_vehicle(request.form)
     flash(msg, "success" if ok else "danger")
     return redirect(url_for("staff.staff_vehicles"))
 
@@ -101,7 +88,7 @@ def staff_add_user():
         flash("Username, role and password are required.", "danger")
         return redirect(url_for("staff.staff_users"))
 
-    if role not in ("individual", "corporate"):
+    if role not in CUSTOMER_ROLES:
         flash("Role must be 'individual' or 'corporate'.", "danger")
         return redirect(url_for("staff.staff_users"))
 
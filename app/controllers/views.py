@@ -1,62 +1,75 @@
 from datetime import date
 
-from flask import Blueprint, render_template, session, redirect, url_for
+from flask import Blueprint, g, render_template, session, redirect
 
+from ..models.store import Store
 from ..services.user_service import UserService
 from ..services.vehicle_service import VehicleService
+from ..utils.caching import conditional_render
+from ..utils.constants import ROLE_DASHBOARDS
 from ..utils.decorators import login_required, role_required
+from ..utils.security import current_uid
+from ..utils.urls import dashboard_url, login_url
 
 bp = Blueprint("views", __name__)
 
 
+@bp.before_request
+def _stamp_today():
+    """Resolve today's date once per request: the overdue sweep and the dashboards' context share it."""
+    g.today = date.today()
+    g.today_str = g.today.isoformat()
+
+
 @bp.get("/")
 @login_required
 def home():
+    # Known roles go to their dashboard (URLs cached per app); anything else sees the login page
     role = session.get("role")
-    if role == "staff":
-        return redirect("/dashboard/staff")
-    elif role == "corporate":
-        return redirect("/dashboard/corporate")
-    elif role == "individual":
-        return redirect("/dashboard/individual")
-    else:
-        return render_template("auth/login.html")
+    return redirect(dashboard_url(role)) if role in ROLE_DASHBOARDS else render_template("auth/login.html")
 
 
 @bp.get("/dashboard/individual")
 @login_required
 @role_required("individual")
 def individual_dashboard():
-    VehicleService.refresh_overdue_flags()
+    VehicleService.refresh_overdue_flags(g.today)
 
-    uid = session.get("uid")
+    uid = current_uid()
     if not uid:
-        return redirect(url_for("auth.login"))
-    rentals = UserService.rentals_for_user(uid)
+        return redirect(login_url())
 
-    return render_template("dashboards/dash_individual.html", rentals=rentals,
-                           current_date=date.today().strftime("%Y-%m-%d"))
+    def build_context():
+        return {"rentals": UserService.rentals_for_user(uid), "current_date": g.today_str}
+
+    # The rentals list only changes with the store; the date with the day (uid is in the ETag)
+    etag_parts = (Store.instance().version, g.today_str, "dash", "individual")
+    return conditional_render("dashboards/dash_individual.html", etag_parts, build_context)
 
 
 @bp.get("/dashboard/corporate")
 @login_required
 @role_required("corporate")
 def corporate_dashboard():
-    VehicleService.refresh_overdue_flags()
+    VehicleService.refresh_overdue_flags(g.today)
 
-    uid = session.get("uid")
+    uid = current_uid()
     if not uid:
-        return redirect(url_for("auth.login"))
-    rentals = UserService.rentals_for_user(uid)
+        return redirect(login_url())
+
+    def build_context():
+        return {"rentals": UserService.rentals_for_user(uid), "current_date": g.today_str}
 
-    return render_template("dashboards/dash_corporate.html", rentals=rentals,
-                           current_date=date.today().strftime("%Y-%m-%d"))
+    # The rentals list only changes with the store; the date with the day (uid is in the ETag)
+    etag_parts = (Store.instance().version, g.today_str, "dash", "corporate")
+    return conditional_render("dashboards/dash_corporate.html", etag_parts, build_context)
 
 
 @bp.get("/dashboard/staff")
 @login_required
 @role_required("staff")
 def staff_dashboard():
-    VehicleService.refresh_overdue_flags()
+    VehicleService.refresh_overdue_flags(g.today)
 
-    return render_template("dashboards/dash_staff.html")
+    # Static menu page: only the session identity (already in the ETag) varies
+    return conditional_render("dashboards/dash_staff.html", ("dash", "staff"), dict)
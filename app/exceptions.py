@@ -6,67 +6,50 @@ to render friendly messages instead of generic 500 errors.
 """
 
 
-class VehicleNotFoundError(Exception):
-    """Raised when a vehicle ID cannot be found in the system."""
+class AppError(Exception):
+    """Base class for app errors; subclasses only override `default_message`."""
+
+    default_message = "Error"
 
-    def __init__(self, message: str = "Error: vehicle not found") -> None:
-        self.message = message
+    def __init__(self, message: str | None = None) -> None:
+        self.message = message if message is not None else self.default_message
         super().__init__(self.message)
 
     def __str__(self) -> str:  # pragma: no cover
         return self.message
 
 
-class UserNotFoundError(Exception):
-    """Raised when a user/renter ID cannot be found in the system."""
+class VehicleNotFoundError(AppError):
+    """Raised when a vehicle ID cannot be found in the system."""
 
-    def __init__(self, message: str = "Error: user not found") -> None:
-        self.message = message
-        super().__init__(self.message)
+    default_message = "Error: vehicle not found"
 
-    def __str__(self) -> str:  # pragma: no cover
-        return self.message
 
+class UserNotFoundError(AppError):
+    """Raised when a user/renter ID cannot be found in the system."""
 
-class RentalNotFoundError(Exception):
-    """Raised when a rental record cannot be found in the system."""
+    default_message = "Error: user not found"
 
-    def __init__(self, message: str = "Error: rental not found") -> None:
-        self.message = message
-        super().__init__(self.message)
 
-    def __str__(self) -> str:  # pragma: no cover
-        return self.message
+class RentalNotFoundError(AppError):
+    """Raised when a rental record cannot be found in the system."""
 
+    default_message = "Error: rental not found"
 
-class InvalidDateRangeError(Exception):
+
+class InvalidDateRangeError(AppError):
     """Raised when start date is after end date or an invalid date is provided."""
 
-    def __init__(self, message: str = "Error: invalid date range") -> None:
-        self.message = message
-        super().__init__(self.message)
+    default_message = "Error: invalid date range"
 
-    def __str__(self) -> str:  # pragma: no cover
-        return self.message
 
-
-class VehicleUnavailableError(Exception):
+class VehicleUnavailableError(AppError):
     """Raised when a vehicle is not available for the requested dates."""
 
-    def __init__(self, message: str = "Error: vehicle is not available") -> None:
-        self.message = message
-        super().__init__(self.message)
-
-    def __str__(self) -> str:  # pragma: no cover
-        return self.message
+    default_message = "Error: vehicle is not available"
 
 
-class PaymentProcessingError(Exception):
+class PaymentProcessingError(AppError):
     """Raised when payment or invoice generation fails."""
 
-    def __init__(self, message: str = "Error: payment processing failed") -> None:
-        self.message = message
-        super().__init__(self.message)
-
-    def __str__(self) -> str:  # pragma: no cover
-        return self.message
+    default_message = "Error: payment processing failed"
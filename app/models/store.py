@@ -1,15 +1,94 @@
 import atexit
+import heapq
+import itertools
+import logging
 import os
 import pickle
+import sys
 import threading
+import time
 import uuid
+import weakref
+from datetime import date
 from pathlib import Path
+from app.utils.constants import ACTIVE_RENTAL_STATUSES, RentalStatus
 from app.utils.security import generate_hash
 
+log = logging.getLogger(__name__)
+
 # ---- Paths ----
 BASE_DIR = Path(__file__).resolve().parents[2]
 DEFAULT_DATA_PATH = BASE_DIR / "data.pkl"
 
+# fsync each dump so a crash cannot lose an acknowledged write; test/dev runs skip it
+FSYNC = os.getenv("APP_ENV") not in ("test", "dev")
+
+# Seconds the background writer waits to coalesce a burst of writes into one dump
+FLUSH_INTERVAL = 2.0
+
+
+class _BackgroundWriter:
+    """
+    One daemon thread that persists dirty stores off the request path.
+    Stores call schedule() after a change; the thread sleeps FLUSH_INTERVAL so a burst of
+    writes costs a single pickle dump, then flushes every pending store.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._pending: set = set()
+        # Every store that has ever scheduled a write; the exit hook checks their _dirty flags
+        self._stores: "weakref.WeakSet[Store]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def schedule(self, store: "Store"):
+        with self._lock:
+            self._pending.add(store)
+            self._stores.add(store)
+            # (Re)start lazily; a forked worker does not inherit the parent's thread
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="store-writer", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            self._wake.clear()
+            self.flush_all()
+
+    def flush_all(self):
+        """Persist every pending store now; a store whose save fails stays pending for a retry."""
+        with self._lock:
+            stores, self._pending = self._pending, set()
+        for store in stores:
+            try:
+                store.flush()
+            except Exception as e:
+                with self._lock:
+                    self._pending.add(store)
+                log.warning("Background save failed (%s); will retry on next change or exit.", e)
+
+    def flush_dirty(self):
+        """
+        Exit hook: flush every store that is still dirty, pending or not. Store.flush() checks
+        _dirty under the store lock, so it first waits for a dump the writer thread is still
+        running (which already cleared the flag) instead of letting exit cut it off.
+        """
+        with self._lock:
+            stores = list(self._stores)
+        for store in stores:
+            try:
+                store.flush()
+            except Exception as e:
+                log.warning("Save at exit failed (%s); changes since the last save are lost.", e)
+
+
+_writer = _BackgroundWriter(FLUSH_INTERVAL)
+
 
 class Store:
     _inst = None
@@ -23,8 +102,34 @@ class Store:
         self.rentals: dict[str, dict] = {}
         self._rw = threading.RLock()
 
-        print(f"[Store] Using file: {self.path}")
+        # Bumped on every write; lets readers (ETags, caches) detect changes cheaply
+        self.version = 0
+        # Changes not yet written to disk (see mark_dirty/flush)
+        self._dirty = False
+
+        # Read-only vehicle snapshot for lock-free readers: (key, tuple_of_vehicle_dicts, by_type, by_name)
+        self._vehicle_snapshot: tuple = (None, (), {}, {})
+
+        # username -> renter_id for login/registration lookups (first user wins on duplicates)
+        self.users_by_username: dict[str, str] = {}
+        self._indexed_users: tuple = (None, 0)
+
+        # Secondary indexes: vehicle_id / renter_id -> [rental_id, ...] (rentals are never deleted)
+        self.rentals_by_vehicle: dict[str, list[str]] = {}
+        self.rentals_by_user: dict[str, list[str]] = {}
+        self._indexed_rentals: tuple = (None, 0)
+
+        # Min-heap of (end_ord, seq, rental_id) for 'rented' rentals; entries that were returned
+        # or cancelled meanwhile are discarded lazily when popped (seq keeps mixed id types unordered)
+        self._rented_end_heap: list[tuple] = []
+        self._heap_seq = itertools.count()
+
+        # Per-vehicle active booking intervals: vehicle_id -> (key, starts, max_ends)
+        self._interval_cache: dict[str, tuple] = {}
+
+        log.debug("Using file: %s", self.path)
         self._load()
+        self._index_rentals()
 
         # Default staff account:
         # Created only when the file does not exist or is empty
@@ -40,15 +145,19 @@ class Store:
                 }
                 self._dump()
 
-        # Automatically save on exit (skipped in test environments)
+        # Automatically write pending changes on exit (skipped in test environments)
         if not Store._atexit_registered and os.getenv("APP_ENV") != "test":
-            atexit.register(self.save)
+            atexit.register(_writer.flush_dirty)
             Store._atexit_registered = True
 
     # ---------- Singleton ----------
     @classmethod
     def instance(cls, path: str | os.PathLike | None = None):
         """Return the global singleton instance of Store."""
+        inst = cls._inst
+        if inst is not None:
+            # Fast path: the singleton never changes once built, so skip the lock
+            return inst
         with cls._inst_lock:
             if cls._inst is None:
                 cls._inst = Store(path or DEFAULT_DATA_PATH)
@@ -68,55 +177,303 @@ class Store:
             with open(self.path, "rb") as f:
                 data = pickle.load(f)
         except Exception as e:
-            print(f"[Store] Load failed ({e}); starting empty.")
+            log.warning("Load failed (%s); starting empty.", e)
             return
 
         if isinstance(data, dict):
             self.users = data.get("users", {}) or {}
             self.vehicles = data.get("vehicles", {}) or {}
             self.rentals = data.get("rentals", {}) or {}
-            print(
-                f"[Store] Loaded: users={len(self.users)}, vehicles={len(self.vehicles)}, rentals={len(self.rentals)}")
+            # One-time backfill for rentals pickled before day ordinals were stored,
+            # plus interning of the small vocabularies every filter compares against
+            for r in self.rentals.values():
+                self._intern_fields(self._with_ordinals(r), "status")
+            for v in self.vehicles.values():
+                self._intern_fields(v, "type", "status")
+                v.setdefault("label", self.vehicle_label(v))
+            for u in self.users.values():
+                self._intern_fields(u, "role")
+            log.debug("Loaded: users=%d, vehicles=%d, rentals=%d", len(self.users), len(self.vehicles), len(self.rentals))
         else:
             # Handle incompatible data format: backup the old file and start empty
             try:
                 bak = self.path + ".bak"
                 os.replace(self.path, bak)
-                print(f"[Store] Incompatible store ({type(data).__name__}); backed up to {bak}. Starting empty.")
+                log.warning("Incompatible store (%s); backed up to %s. Starting empty.", type(data).__name__, bak)
             except Exception as e:
-                print(f"[Store] Backup failed: {e}")
+                log.warning("Backup failed: %s", e)
 
     def _dump(self):
         """Write the in-memory data to the pickle file safely (atomic replace)."""
         os.makedirs(os.path.dirname(self.path), exist_ok=True)
         tmp = self.path + ".tmp"
+        # Pickle a two-level copy: request handlers edit these dicts without the store lock,
+        # and dict(...) copies atomically, so a concurrent insert/delete cannot break the dump
         payload = {
-            "users": self.users,
-            "vehicles": self.vehicles,
-            "rentals": self.rentals,
+            "users": {k: dict(u) for k, u in dict(self.users).items()},
+            "vehicles": {k: dict(v) for k, v in dict(self.vehicles).items()},
+            "rentals": {k: dict(r) for k, r in dict(self.rentals).items()},
         }
         with open(tmp, "wb") as f:
             pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
-            f.flush()
-            os.fsync(f.fileno())
+            if FSYNC:
+                f.flush()
+                os.fsync(f.fileno())
         os.replace(tmp, self.path)
 
+    def mark_dirty(self):
+        """
+        Record a change: readers see the new version now, the background writer persists it.
+        The bump runs under the store lock (reentrant, so Store methods already holding it are
+        fine): services call this without the lock, and a lost or reordered increment would
+        let a stale ETag/analytics/interval cache entry pass as current.
+        """
+        with self._rw:
+            self.version += 1
+            self._dirty = True
+        _writer.schedule(self)
+
+    def flush(self):
+        """Write pending changes to disk now; no-op when nothing changed since the last write."""
+        with self._rw:
+            if not self._dirty:
+                return
+            self._dirty = False
+            try:
+                self._dump()
+            except Exception:
+                self._dirty = True
+                raise
+
     def save(self):
-        """Thread-safe save method."""
+        """Thread-safe synchronous save (scripts and shutdown); request paths use mark_dirty()."""
         with self._rw:
-            print(f"[Store] Saving to {self.path} ...")
+            log.debug("Saving to %s ...", self.path)
+            self.version += 1
+            self._dirty = False
             self._dump()
 
+    # ---------- Indexes ----------
+    def _index_rentals(self):
+        """Rebuild the rental secondary indexes with a single pass over self.rentals."""
+        by_vehicle: dict[str, list[str]] = {}
+        by_user: dict[str, list[str]] = {}
+        heap: list[tuple] = []
+        for rid, r in self.rentals.items():
+            by_vehicle.setdefault(str(r.get("vehicle_id")), []).append(rid)
+            by_user.setdefault(str(r.get("renter_id")), []).append(rid)
+            self._push_rented(heap, rid, r)
+        self.rentals_by_vehicle = by_vehicle
+        self.rentals_by_user = by_user
+        self._rented_end_heap = heap
+        self._indexed_rentals = (id(self.rentals), len(self.rentals))
+
+    def _push_rented(self, heap: list, rid, r: dict):
+        """Track a 'rented' rental by end day so the overdue sweep can pop only due ones."""
+        if r.get("status") == RentalStatus.RENTED:
+            _, end = self.rental_ordinals(r)
+            if end is not None:
+                heapq.heappush(heap, (end, next(self._heap_seq), rid))
+
+    def pop_due_rentals(self, today_ord: int) -> list[dict]:
+        """
+        Remove and return the rentals that are still 'rented' but ended before `today_ord`.
+        O(log n) per due rental instead of a scan over every rental.
+        """
+        with self._rw:
+            self._sync_rental_index()
+            heap, rentals, due = self._rented_end_heap, self.rentals, []
+            while heap and heap[0][0] < today_ord:
+                end, _, rid = heapq.heappop(heap)
+                r = rentals.get(rid)
+                if r is None:
+                    # Rentals are never deleted: the dict was cleared and reseeded, start over
+                    self._index_rentals()
+                    return self.pop_due_rentals(today_ord)
+                # Skip entries left behind when update_rental() moved the end date (re-pushed)
+                if r.get("status") == RentalStatus.RENTED and self.rental_ordinals(r)[1] == end:
+                    due.append(r)
+            return due
+
+    def _sync_rental_index(self):
+        """Resync when rentals were added without create_rental() (seeded or dict replaced)."""
+        if self._indexed_rentals != (id(self.rentals), len(self.rentals)):
+            self._index_rentals()
+
+    def _vehicle_tables(self) -> tuple:
+        """
+        (key, all_vehicles, by_type, by_name) rebuilt together after any write or direct add/remove.
+        by_name maps each distinct lowercased brand/model to the snapshot positions using it.
+        """
+        key = (self.version, len(self.vehicles))
+        tables = self._vehicle_snapshot
+        if tables[0] != key:
+            snap = tuple(self.vehicles.values())
+            by_type: dict[str, list[dict]] = {}
+            by_name: dict[str, set[int]] = {}
+            for pos, v in enumerate(snap):
+                by_type.setdefault((v.get("type") or "").strip().lower(), []).append(v)
+                by_name.setdefault((v.get("brand") or "").lower(), set()).add(pos)
+                by_name.setdefault((v.get("model") or "").lower(), set()).add(pos)
+            tables = (key, snap, {t: tuple(rows) for t, rows in by_type.items()}, by_name)
+            self._vehicle_snapshot = tables
+        return tables
+
+    def vehicle_snapshot(self) -> tuple[dict, ...]:
+        """
+        Return an immutable tuple of vehicle records for list endpoints.
+        Rebuilt lazily after any write (version bump) or direct add/remove, and published
+        as a single attribute, so readers take no lock and never iterate a dict being resized.
+        """
+        return self._vehicle_tables()[1]
+
+    def vehicles_of_type(self, vtype: str) -> tuple[dict, ...]:
+        """Vehicles whose normalized type equals `vtype`, from the same lazily rebuilt snapshot."""
+        return self._vehicle_tables()[2].get(vtype, ())
+
+    def vehicles_matching(self, keyword: str) -> tuple[dict, ...]:
+        """
+        Vehicles whose lowercased brand or model contains `keyword`, in snapshot order.
+        Scans the distinct brand/model names (far fewer than vehicles), not every vehicle.
+        """
+        _, snap, _, by_name = self._vehicle_tables()
+        hits: set[int] = set()
+        for name, positions in by_name.items():
+            if keyword in name:
+                hits |= positions
+        return tuple(snap[pos] for pos in sorted(hits))
+
+    def _indexed_lookup(self, index_name: str, key) -> list[dict]:
+        """Dereference one index bucket; a dangling id means the dict was cleared and reseeded."""
+        self._sync_rental_index()
+        rentals = self.rentals
+        ids = getattr(self, index_name).get(str(key), ())
+        if any(rid not in rentals for rid in ids):
+            self._index_rentals()
+            ids = getattr(self, index_name).get(str(key), ())
+        return [rentals[rid] for rid in ids]
+
+    def rentals_for_vehicle(self, vehicle_id) -> list[dict]:
+        """Return every rental of one vehicle in O(k) via the vehicle index."""
+        return self._indexed_lookup("rentals_by_vehicle", vehicle_id)
+
+    def rentals_for_user(self, renter_id) -> list[dict]:
+        """Return every rental of one renter in O(k) via the renter index."""
+        return self._indexed_lookup("rentals_by_user", renter_id)
+
+    @staticmethod
+    def day_ordinal(value) -> int | None:
+        """'YYYY-MM-DD' (or ISO datetime) -> date.toordinal(); None if missing or malformed."""
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(str(value).split("T", 1)[0].strip()).toordinal()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def rental_ordinals(r: dict) -> tuple[int | None, int | None]:
+        """(start_ord, end_ord) of a rental: stored integers, else parsed from the date strings."""
+        s, e = r.get("start_ord"), r.get("end_ord")
+        if s is None:
+            s = Store.day_ordinal(r.get("start_date") or r.get("start"))
+        if e is None:
+            e = Store.day_ordinal(r.get("end_date") or r.get("end"))
+        return s, e
+
+    @staticmethod
+    def vehicle_label(v: dict) -> str:
+        """Display label "Brand Model" (first 6 chars of the id if both are blank)."""
+        return f"{v.get('brand', '')} {v.get('model', '')}".strip() or str(v.get("vehicle_id", ""))[:6]
+
+    @staticmethod
+    def _intern_fields(record: dict, *fields: str) -> dict:
+        """
+        sys.intern() the given string fields (status/role/type). Unpickled values are fresh
+        string objects; interned ones share the literal's object, so == against the
+        constants short-circuits on identity.
+        """
+        for field in fields:
+            value = record.get(field)
+            if type(value) is str:
+                record[field] = sys.intern(value)
+        return record
+
+    @staticmethod
+    def _with_ordinals(r: dict) -> dict:
+        """Store start_ord/end_ord on a rental once so later passes compare plain ints."""
+        if r.get("start_ord") is None or r.get("end_ord") is None:
+            r["start_ord"], r["end_ord"] = Store.rental_ordinals(r)
+        return r
+
+    @staticmethod
+    def build_intervals(rentals) -> tuple[list[int], list[int]]:
+        """
+        Turn rental records into active booking intervals as day ordinals, sorted by start.
+        Returns (starts, max_ends) where max_ends[i] is the latest end among the first i+1
+        intervals, so one bisect answers "does [d1, d2) overlap any booking?".
+        Records that are inactive or have missing/malformed dates are skipped.
+        """
+        spans = []
+        for r in rentals:
+            if str(r.get("status") or "").lower() not in ACTIVE_RENTAL_STATUSES:
+                continue
+            s, e = Store.rental_ordinals(r)
+            if s is None or e is None:
+                continue
+            spans.append((s, e))
+        spans.sort()
+
+        starts, max_ends, hi = [], [], None
+        for s, e in spans:
+            hi = e if hi is None or e > hi else hi
+            starts.append(s)
+            max_ends.append(hi)
+        return starts, max_ends
+
+    def active_intervals(self, vehicle_id) -> tuple[list[int], list[int]]:
+        """
+        Cached build_intervals() for one vehicle. A hit costs O(1): the key is the store
+        version plus the rentals dict's identity and size, so any mark_dirty() write, direct
+        seeding or dict replacement rebuilds it (O(k) over the vehicle's index bucket).
+        In-place edits to a rental must call mark_dirty(), as every service already does.
+        """
+        vid = str(vehicle_id)
+        key = (self.version, id(self.rentals), len(self.rentals))
+        hit = self._interval_cache.get(vid)
+        if hit is not None and hit[0] == key:
+            return hit[1], hit[2]
+        starts, max_ends = self.build_intervals(self.rentals_for_vehicle(vid))
+        self._interval_cache[vid] = (key, starts, max_ends)
+        return starts, max_ends
+
     # ---------- Users ----------
+    def _index_users(self):
+        """Rebuild the username index from the users dict."""
+        index: dict[str, str] = {}
+        for rid, u in self.users.items():
+            index.setdefault(u.get("username"), rid)
+        self.users_by_username = index
+        self._indexed_users = (id(self.users), len(self.users))
+
     def user_exists(self, username: str) -> bool:
         """Return True if the given username already exists."""
-        return any(u["username"] == username for u in self.users.values())
+        return self.find_user(username) is not None
 
     def find_user(self, username: str) -> dict | None:
-        """Find a user by username."""
-        for u in self.users.values():
-            if u["username"] == username:
-                return u
+        """
+        Find a user by username in O(1) via the username index.
+        The index resyncs when users were added/removed directly or the dict replaced,
+        and when a hit no longer points at a user with that name.
+        """
+        if self._indexed_users != (id(self.users), len(self.users)):
+            self._index_users()
+        u = self.users.get(self.users_by_username.get(username))
+        if u is not None and u.get("username") == username:
+            return u
+        if u is not None or username in self.users_by_username:
+            self._index_users()
+            return self.users.get(self.users_by_username.get(username))
         return None
 
     def get_user(self, renter_id: str) -> dict | None:
@@ -133,9 +490,11 @@ class Store:
                 "renter_id": rid,
                 "username": username,
                 "password_hash": password_hash,
-                "role": role,
+                "role": sys.intern(role),
             }
-            self._dump()
+            self.users_by_username.setdefault(username, rid)
+            self._indexed_users = (id(self.users), len(self.users))
+            self.mark_dirty()
             return rid
 
     def delete_user(self, renter_id: str) -> bool:
@@ -143,7 +502,9 @@ class Store:
         with self._rw:
             if renter_id in self.users:
                 del self.users[renter_id]
-                self._dump()
+                # Rebuilt on the next lookup, so a seeded duplicate name can take over
+                self._indexed_users = (None, 0)
+                self.mark_dirty()
                 return True
             return False
 
@@ -161,7 +522,9 @@ class Store:
                 "status": data.get("status", "available"),
                 "image_path": data.get("image_path", "/static/images/placeholder.png"),
             }
-            self._dump()
+            v = self._intern_fields(self.vehicles[vid], "type", "status")
+            v["label"] = self.vehicle_label(v)
+            self.mark_dirty()
             return vid
 
     def get_vehicle(self, vehicle_id: str) -> dict | None:
@@ -184,7 +547,9 @@ class Store:
                 val = updates.get("image_path") or ""
                 updates["image_path"] = val.strip() or "/static/images/placeholder.png"
             v.update({k: v2 for k, v2 in updates.items() if v2 is not None})
-            self._dump()
+            if "brand" in updates or "model" in updates:
+                v["label"] = self.vehicle_label(v)
+            self.mark_dirty()
             return True
 
     def delete_vehicle(self, vehicle_id: str) -> bool:
@@ -192,7 +557,7 @@ class Store:
         with self._rw:
             if vehicle_id in self.vehicles:
                 del self.vehicles[vehicle_id]
-                self._dump()
+                self.mark_dirty()
                 return True
             return False
 
@@ -200,21 +565,39 @@ class Store:
     def create_rental(self, r: dict) -> str:
         """Create a new rental record."""
         with self._rw:
+            self._sync_rental_index()
             rid = str(uuid.uuid4())
-            r = dict(r)
+            r = self._intern_fields(self._with_ordinals(dict(r)), "status")
             r["rental_id"] = rid
             self.rentals[rid] = r
-            self._dump()
+            self.rentals_by_vehicle.setdefault(str(r.get("vehicle_id")), []).append(rid)
+            self.rentals_by_user.setdefault(str(r.get("renter_id")), []).append(rid)
+            self._push_rented(self._rented_end_heap, rid, r)
+            self._indexed_rentals = (id(self.rentals), len(self.rentals))
+            self.mark_dirty()
             return rid
 
     def update_rental(self, rid: str, updates: dict) -> bool:
-        """Update an existing rental by ID."""
+        """
+        Update an existing rental by ID, keeping derived data in step: new dates recompute
+        the day ordinals (and re-queue a 'rented' rental by its new end day); a new vehicle,
+        renter or status rebuilds the rental indexes.
+        """
         with self._rw:
-            if rid in self.rentals:
-                self.rentals[rid].update(updates)
-                self._dump()
-                return True
-            return False
+            if rid not in self.rentals:
+                return False
+            r = self.rentals[rid]
+            r.update(updates)
+            moved = "start_date" in updates or "end_date" in updates
+            if moved and not ("start_ord" in updates and "end_ord" in updates):
+                r["start_ord"] = r["end_ord"] = None
+                self._with_ordinals(r)
+            if updates.keys() & {"vehicle_id", "renter_id", "status"}:
+                self._index_rentals()
+            elif moved:
+                self._push_rented(self._rented_end_heap, rid, r)
+            self.mark_dirty()
+            return True
 
 
 # Backward compatibility for old imports:
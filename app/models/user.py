@@ -1,47 +1,52 @@
 from dataclasses import dataclass
 
+from app.utils.constants import Role
 
-@dataclass
+# Discount policy: role -> (minimum rental days, discount ratio); roles not listed
+# (staff, unknown) get no discount.
+DISCOUNT_RULES = {
+    Role.CORPORATE: (0, 0.15),  # flat 15% off
+    Role.INDIVIDUAL: (7, 0.10),  # 10% off rentals of 7+ days
+}
+
+
+def discount_ratio(role: str, days: int) -> float:
+    """Discount ratio in [0, 1] for a role and rental length, e.g. 0.15 means 15% off."""
+    min_days, ratio = DISCOUNT_RULES.get(role, (0, 0.0))
+    return ratio if days >= min_days else 0.0
+
+
+@dataclass(slots=True, frozen=True)
 class UserBase:
     """
-    Base user model. The Store keeps raw dicts; we wrap them into rich objects
-    to express discount logic via polymorphism.
+    Base user model. The Store keeps raw dicts; we wrap them into rich objects.
+    Discounts come from the shared DISCOUNT_RULES table, the same one rent() prices with.
     """
     user_id: str
     username: str
     role: str  # "individual" | "corporate" | "staff"
 
     def discount_for(self, days: int) -> float:
-        """
-        Return a discount ratio in [0, 1], e.g. 0.15 means 15% off.
-        Subclasses override this to implement role-specific rules.
-        """
-        return 0.0
+        """Return this user's discount ratio for a rental of `days` days."""
+        return discount_ratio(self.role, days)
 
 
 class IndividualUser(UserBase):
     """
     Individuals get 10% off for long rentals (>= 7 days).
     """
-
-    def discount_for(self, days: int) -> float:
-        return 0.10 if days >= 7 else 0.0
+    __slots__ = ()
 
 
 class CorporateUser(UserBase):
     """
     Corporate customers get a flat 15% discount.
     """
-
-    def discount_for(self, days: int) -> float:
-        return 0.15
+    __slots__ = ()
 
 
 class StaffUser(UserBase):
     """
-    Staff rule can vary by assignment; here we grant 100% off as an example.
-    Adjust if your marking rubric expects a different rule.
+    Staff accounts manage the fleet; they get no rental discount.
     """
-
-    def discount_for(self, days: int) -> float:
-        return 1.0
+    __slots__ = ()
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class VehicleBase:
     """
     Base vehicle model. Per-day rate is the public listed price before discount.
@@ -25,13 +25,14 @@ class Car(VehicleBase):
     """
     Cars follow the base rule.
     """
-    pass
+    __slots__ = ()
 
 
 class Motorbike(VehicleBase):
     """
     Example: motorbikes are 10% cheaper than the listed daily rate.
     """
+    __slots__ = ()
 
     def price_for_days(self, days: int) -> float:
         return super().price_for_days(days) * 0.9
@@ -41,6 +42,7 @@ class Truck(VehicleBase):
     """
     Example: trucks carry a 20% surcharge over the base.
     """
+    __slots__ = ()
 
     def price_for_days(self, days: int) -> float:
         return super().price_for_days(days) * 1.2
@@ -1,23 +1,53 @@
 from __future__ import annotations
 
-from collections import Counter, defaultdict
+import heapq
+from collections import Counter
+from operator import itemgetter
 
 from app.models.store import Store
 
 
+def _state_key(store) -> tuple:
+    """
+    Identity of the store's contents: the store itself (not id(), which can be reused),
+    its write counter and table sizes, so both saves and direct inserts change the key.
+    """
+    return store, store.version, len(store.users), len(store.vehicles), len(store.rentals)
+
+
 class AnalyticsService:
     """Aggregations for dashboards and staff analytics."""
 
+    # Last payload per report: name -> (store state key, payload)
+    _cache: dict[str, tuple] = {}
+
     @staticmethod
-    def analytics_summary():
+    def _memoized(name: str, compute):
+        """Return the cached `name` report while the store is unchanged, else recompute it."""
         store = Store.instance()
+        key = _state_key(store)
+        hit = AnalyticsService._cache.get(name)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        payload = compute(store)
+        AnalyticsService._cache[name] = (key, payload)
+        return payload
+
+    @staticmethod
+    def analytics_summary():
+        """Headline totals and the most/least rented vehicles, memoized until the store changes."""
+        return AnalyticsService._memoized("summary", AnalyticsService._compute_summary)
+
+    @staticmethod
+    def _compute_summary(store):
         veh_counts: dict[str, int] = {}
         revenue = 0.0
         for r in store.rentals.values():
             veh_counts[r["vehicle_id"]] = veh_counts.get(r["vehicle_id"], 0) + 1
             revenue += float(r.get("total", 0))
-        top = sorted(veh_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        bottom = sorted(veh_counts.items(), key=lambda x: x[1])[:5]
+        # Top/bottom 5 in O(N log 5); same result and tie order as sorted(...)[:5]
+        top = heapq.nlargest(5, veh_counts.items(), key=itemgetter(1))
+        bottom = heapq.nsmallest(5, veh_counts.items(), key=itemgetter(1))
         return {
             "total_vehicles": len(store.vehicles),
             "total_users": len(store.users),
@@ -29,19 +59,37 @@ class AnalyticsService:
 
     @staticmethod
     def analytics():
-        store = Store.instance()
+        """Staff analytics payload, memoized until the store changes."""
+        return AnalyticsService._memoized("analytics", AnalyticsService._compute_analytics)
 
+    @staticmethod
+    def _compute_analytics(store):
         # Totals
         total_users = len(store.users)
         total_vehicles = len(store.vehicles)
         total_rentals = len(store.rentals)
-        revenue = round(sum((r.get("total") or 0) for r in store.rentals.values()), 2)
+
+        # One pass over rentals: count per vehicle, total revenue, revenue by start_date
+        # (plain dicts with bound .get: no Counter/defaultdict dispatch per row)
+        cnt: dict = {}
+        rev_by_date: dict[str, float] = {}
+        cnt_get, rev_get = cnt.get, rev_by_date.get
+        revenue = 0.0
+        for r in store.rentals.values():
+            vid = r.get("vehicle_id")
+            cnt[vid] = cnt_get(vid, 0) + 1
+            amount = float(r.get("total") or 0)
+            revenue += amount
+            d = r.get("start_date")
+            if d:
+                rev_by_date[d] = rev_get(d, 0.0) + amount
+        revenue = round(revenue, 2)
 
         # Rentals per vehicle
-        cnt = Counter([r.get("vehicle_id") for r in store.rentals.values()])
+        # Labels are stored on the vehicle at create/update; directly seeded rows get one built here
         rentals_by_vehicle = []
         for vid, v in store.vehicles.items():
-            label = f"{v.get('brand', '')} {v.get('model', '')}".strip()
+            label = v.get("label") or f"{v.get('brand', '')} {v.get('model', '')}".strip()
             rentals_by_vehicle.append({
                 "vehicle_id": vid,
                 "label": label or vid[:6],
@@ -50,16 +98,10 @@ class AnalyticsService:
         rentals_by_vehicle.sort(key=lambda x: x["count"], reverse=True)
 
         # Revenue by date (group by rental start_date)
-        rev_by_date = defaultdict(float)
-        for r in store.rentals.values():
-            d = r.get("start_date")
-            if not d:
-                continue
-            rev_by_date[d] += float(r.get("total") or 0)
         revenue_by_date = [{"date": k, "total": round(v, 2)} for k, v in sorted(rev_by_date.items())]
 
         # Users by role
-        role_cnt = Counter([u.get("role", "") for u in store.users.values()])
+        role_cnt = Counter(u.get("role", "") for u in store.users.values())
         users_by_role = [{"role": k or "unknown", "count": v} for k, v in role_cnt.items()]
 
         return {
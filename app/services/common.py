@@ -1,18 +1,21 @@
 """Shared service helpers and factories."""
 
+import re
+from bisect import bisect_left
+from contextlib import nullcontext
 from datetime import datetime, date
+from functools import lru_cache
 from typing import Optional
-from urllib.parse import urlparse
 
 from app.models.store import Store
 from app.models.user import UserBase, IndividualUser, CorporateUser, StaffUser
 from app.models.vehicle import VehicleBase, Car, Motorbike, Truck
+from app.utils.constants import ACTIVE_RENTAL_STATUSES, ALLOWED_TYPES  # noqa: F401 (re-exported)
 from math import isnan
 
 DATE_FMT = "%Y-%m-%d"
-ALLOWED_TYPES = {"car", "motorbike", "truck"}
 PLACEHOLDER = "/static/images/placeholder.png"
-ACTIVE_RENTAL_STATES = {"rented", "overdue"}
+ACTIVE_RENTAL_STATES = ACTIVE_RENTAL_STATUSES
 
 
 def _store() -> Store:
@@ -20,17 +23,98 @@ def _store() -> Store:
     return Store.instance()
 
 
-def _parse_date(s: str) -> date:
-    """Parse 'YYYY-MM-DD' into a date object; raise ValueError on bad input."""
-    return datetime.strptime(s, DATE_FMT).date()
+def mark_dirty(store) -> None:
+    """Flag a change for the store's background writer (no-op for fake stores without persistence)."""
+    fn = getattr(store, "mark_dirty", None) or getattr(store, "save", None)
+    if callable(fn):
+        fn()
+
+
+def store_lock(store):
+    """The store's write lock (a no-op context for fake stores without one)."""
+    return getattr(store, "_rw", None) or nullcontext()
+
+
+def vehicle_rows(store) -> tuple:
+    """Vehicle records via the store's lock-free snapshot (plain dict scan for fake stores)."""
+    snapshot = getattr(store, "vehicle_snapshot", None)
+    if callable(snapshot):
+        return snapshot()
+    return tuple(getattr(store, "vehicles", {}).values())
+
+
+def vehicle_rows_of_type(store, vtype: str) -> tuple:
+    """Vehicle records of one normalized type via the store's type index (dict scan for fake stores)."""
+    lookup = getattr(store, "vehicles_of_type", None)
+    if callable(lookup):
+        return lookup(vtype)
+    return tuple(v for v in getattr(store, "vehicles", {}).values() if norm_type(v.get("type")) == vtype)
+
+
+def vehicle_rows_matching(store, keyword: str) -> tuple:
+    """Vehicle records whose lowercased brand or model contains `keyword` (dict scan for fake stores)."""
+    lookup = getattr(store, "vehicles_matching", None)
+    if callable(lookup):
+        return lookup(keyword)
+    return tuple(v for v in getattr(store, "vehicles", {}).values()
+                 if keyword in _lc(v.get("brand")) or keyword in _lc(v.get("model")))
+
+
+def vehicle_rentals(store, vehicle_id) -> list[dict]:
+    """Rentals of one vehicle via the store's vehicle index (plain dict scan for fake stores)."""
+    lookup = getattr(store, "rentals_for_vehicle", None)
+    if callable(lookup):
+        return lookup(vehicle_id)
+    vid = str(vehicle_id)
+    return [r for r in (getattr(store, "rentals", None) or {}).values() if str(r.get("vehicle_id")) == vid]
+
+
+def rental_ordinals(r: dict) -> tuple[Optional[int], Optional[int]]:
+    """(start_ord, end_ord) day numbers of a rental; None for a missing/malformed date."""
+    return Store.rental_ordinals(r)
+
+
+def vehicle_label(v: dict) -> str:
+    """Display label stored on vehicle records ("Brand Model", or the id prefix)."""
+    return Store.vehicle_label(v)
+
+
+def booked_overlap(store, vehicle_id, start: date, end: date) -> bool:
+    """
+    True if [start, end) overlaps an active (rented/overdue) booking of the vehicle.
+    Bookings are sorted by start, so every candidate starts before `end`: bisect to that
+    prefix and compare its latest end against `start`. With the store's cached interval
+    table a repeat check is O(log k); the table is rebuilt (O(k)) after a write, and
+    fake stores without one rebuild it every call.
+    """
+    lookup = getattr(store, "active_intervals", None)
+    if callable(lookup):
+        starts, max_ends = lookup(vehicle_id)
+    else:
+        starts, max_ends = Store.build_intervals(vehicle_rentals(store, vehicle_id))
+    i = bisect_left(starts, end.toordinal())
+    return i > 0 and max_ends[i - 1] > start.toordinal()
 
 
 # -------- date & math helpers --------
+@lru_cache(maxsize=8192)
 def parse_date(s: str) -> date:
-    """Parse YYYY-MM-DD string to date."""
+    """
+    Parse YYYY-MM-DD string to date.
+    Memoized: dates are immutable and the same few strings recur across every rental scan.
+    Canonical zero-padded input takes the C date.fromisoformat path; anything else
+    (e.g. "2025-1-5") goes through strptime so the accepted formats are unchanged.
+    Bad input still raises ValueError (exceptions are not cached).
+    """
+    if len(s) == 10 and s[4] == s[7] == "-":
+        return date.fromisoformat(s)
     return datetime.strptime(s, DATE_FMT).date()
 
 
+# Backward-compatible alias (shares the cache)
+_parse_date = parse_date
+
+
 def _today() -> date:
     """Wrapper for easier testing/mocking."""
     return date.today()
@@ -80,18 +164,16 @@ def to_float_safe(value) -> Optional[float]:
 
 
 # -------- validators / normalizers --------
+# http(s) URL with a non-empty host, matched once per call without building a ParseResult
+_HTTP_URL = re.compile(r"https?://[^/?#\s]", re.IGNORECASE)
+
+
 def valid_image_path(s: Optional[str]) -> bool:
     """Accept /static/... or absolute http(s) URL."""
     if not s:
         return False
     s = s.strip()
-    if s.startswith("/static/"):
-        return True
-    try:
-        u = urlparse(s)
-        return u.scheme in ("http", "https") and bool(u.netloc)
-    except Exception:
-        return False
+    return s.startswith("/static/") or _HTTP_URL.match(s) is not None
 
 
 def norm_type(value: Optional[str]) -> str:
@@ -1,14 +1,18 @@
 """Rental-related service layer utilities."""
 
-from datetime import date, datetime, timezone
+import time
+from datetime import date, datetime
 from typing import Optional
 
 from app.models.store import Store
+from app.models.user import discount_ratio
+from app.utils.constants import CLOSED_RENTAL_STATUSES
 from app.services.common import (
     DATE_FMT,
-    ACTIVE_RENTAL_STATES,
-    parse_date,
     overlap,
+    rental_ordinals,
+    mark_dirty,
+    booked_overlap,
     user_from_dict,
     vehicle_from_dict,
 )
@@ -29,7 +33,7 @@ def _as_date(x):
 class RentalService:
     """
     Rent, return, cancel, and invoice operations.
-    Uses polymorphic pricing (VehicleBase.price_for_days + UserBase.discount_for).
+    Prices are rate * days less the role discount from app.models.user.DISCOUNT_RULES.
     """
 
     @staticmethod
@@ -81,39 +85,9 @@ class RentalService:
         if d2 <= d1:
             return False, "End date must be after start date", None
 
-        # --- resolve active rental states (fallback if constant missing) ---
-        try:
-            active_states = set(ACTIVE_RENTAL_STATES)  # e.g., {"rented", "overdue"}
-        except Exception:
-            active_states = {"rented", "overdue"}
-
-        # --- conflict check on half-open intervals [d1, d2) ---
-        for r in (st.rentals or {}).values():
-            rv = r.get("vehicle_id")
-            if not (rv == vid_raw or str(rv) == vid_str):
-                continue
-            status_lc = str(r.get("status") or "").lower()
-            if status_lc not in {s.lower() for s in active_states}:
-                continue
-
-            # Support both start_date/end_date and start/end field names
-            s_raw = r.get("start_date") or r.get("start")
-            e_raw = r.get("end_date") or r.get("end")
-            if not s_raw or not e_raw:
-                # Skip malformed records to avoid false positives
-                continue
-
-            try:
-                s = _as_date(s_raw)
-                e = _as_date(e_raw)
-            except Exception:
-                # Skip malformed records
-                continue
-
-            # Overlap for half-open ranges: [d1, d2) intersects [s, e) iff (d1 < e) and (s < d2)
-            if (d1 < e) and (s < d2):
-                # print("DEBUG-OVERLAP:", {"new": [d1, d2], "old": [s, e], "status": r.get("status")})
-                return False, "Date conflict with existing rental", None
+        # --- conflict check on half-open intervals [d1, d2) against the vehicle's bookings ---
+        if booked_overlap(st, vid_str, d1, d2):
+            return False, "Date conflict with existing rental", None
 
         # --- pricing with role-based discount ---
         days = (d2 - d1).days
@@ -126,18 +100,10 @@ class RentalService:
         renter = st.users.get(renter_id) or st.users.get(str(renter_id)) or {}
         role = str(renter.get("role") or "").lower().strip()
 
-        # Discount policy:
-        # - corporate: flat 15% off
-        # - individual: 10% off if rental is >= 7 days
-        # - others (staff/unknown): no discount unless you define one
-        discount_ratio = 0.0
-        if role == "corporate":
-            discount_ratio = 0.15
-        elif role == "individual" and days >= 7:
-            discount_ratio = 0.10
+        discount = discount_ratio(role, days)
 
         base_total = rate * days
-        total = round(base_total * (1.0 - discount_ratio), 2)
+        total = round(base_total * (1.0 - discount), 2)
 
         # --- persist ---
         rid = st.create_rental({
@@ -145,12 +111,15 @@ class RentalService:
             "vehicle_id": vid_str,  # normalize to string ID
             "start_date": d1.isoformat(),
             "end_date": d2.isoformat(),
+            "start_ord": d1.toordinal(),
+            "end_ord": d2.toordinal(),
             "days": days,
             "rate": rate,
-            "discount": discount_ratio,  # store discount ratio (e.g., 0.15)
+            "discount": discount,  # store discount ratio (e.g., 0.15)
             "total": total,  # final price after discount
             "status": "rented",
-            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            # Same UTC 'YYYY-MM-DDTHH:MM:SS+00:00' as datetime.now(timezone.utc).isoformat(timespec="seconds")
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime()),
         })
 
         # --- snapshot vehicle status ---
@@ -159,10 +128,8 @@ class RentalService:
         elif vid_raw in st.vehicles:
             st.vehicles[vid_raw]["status"] = "rented"
 
-        # --- optional save (fake stores in tests may not define save()) ---
-        save_fn = getattr(st, "save", None)
-        if callable(save_fn):
-            save_fn()
+        # --- persist in the background (fake stores in tests may not define persistence) ---
+        mark_dirty(st)
 
         return True, "OK", rid
 
@@ -179,12 +146,14 @@ class RentalService:
         if not r:
             return False, "Rental not found"
 
-        if (r.get("status") or "") in ("returned", "cancelled"):
+        if (r.get("status") or "") in CLOSED_RENTAL_STATUSES:
             return False, "Rental already closed"
 
-        start = parse_date(r["start_date"])
-        end = parse_date(r["end_date"])
+        start, end = rental_ordinals(r)
+        if start is None or end is None:
+            return False, "Rental has invalid dates"
         today = date.today()
+        today_ord = today.toordinal()
 
         rate = float(r.get("rate", 0))
         discount = float(r.get("discount", 0))
@@ -193,18 +162,17 @@ class RentalService:
         total = 0.0
         new_status = "returned"
 
-        if today < start:
+        if today_ord < start:
             new_status = "cancelled"
             total = 0.0
         else:
-            if today <= end:
-                effective_end = today
-                used_days = max(1, (effective_end - start).days)
+            if today_ord <= end:
+                used_days = max(1, today_ord - start)
                 base = rate * used_days
                 total = round(base * (1 - discount), 2)
             else:
-                used_days = max(1, (end - start).days)
-                overdue_days = (today - end).days
+                used_days = max(1, end - start)
+                overdue_days = today_ord - end
                 base = rate * used_days
                 total = round(base * (1 - discount), 2)
 
@@ -220,7 +188,7 @@ class RentalService:
         if vid in store.vehicles:
             store.vehicles[vid]["status"] = "available"
 
-        store.save()
+        mark_dirty(store)
         msg = "Rental cancelled" if new_status == "cancelled" else "Vehicle returned"
         return True, msg
 
@@ -243,8 +211,10 @@ class RentalService:
         if r.get("status") != "rented":
             return False, "Only active rentals can be cancelled"
 
-        start = parse_date(r["start_date"])
-        if not (date.today() < start):
+        start, _ = rental_ordinals(r)
+        if start is None:
+            return False, "Rental has invalid dates"
+        if not (date.today().toordinal() < start):
             return False, "Rental has already started, use return instead"
 
         r.update({
@@ -254,7 +224,7 @@ class RentalService:
             "overdue_days": 0,
             "total": 0.0,
         })
-        store.save()
+        mark_dirty(store)
         return True, "Rental cancelled"
 
     @staticmethod
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+from operator import itemgetter
+
 from app.models.store import Store
+from app.utils.constants import ALL_ROLES
 from app.utils.security import generate_hash
 
 
@@ -11,7 +14,7 @@ class UserService:
     def admin_create_user(username: str, role: str, password: str):
         store = Store.instance()
         role = (role or "").lower().strip()
-        if role not in ("individual", "corporate", "staff"):
+        if role not in ALL_ROLES:
             return False, "Role must be individual/corporate/staff"
         if store.user_exists(username):
             return False, "Username exists"
@@ -27,26 +30,32 @@ class UserService:
     def rentals_for_user(renter_id: str):
         """Return this user's rentals with vehicle info attached."""
         store = Store.instance()
-        out = []
-        for r in store.rentals.values():
-            if r.get("renter_id") != renter_id:
-                continue
-            v = store.vehicles.get(r.get("vehicle_id"), {})
-            out.append({
-                "rental_id": r.get("rental_id"),
-                "vehicle_id": r.get("vehicle_id"),
-                "brand": v.get("brand", ""),
-                "model": v.get("model", ""),
-                "type": v.get("type", ""),
-                "start_date": r.get("start_date"),
-                "end_date": r.get("end_date"),
-                "days": r.get("days"),
-                "rate": r.get("rate"),
-                "discount": r.get("discount"),
-                "total": r.get("total"),
-                "status": r.get("status", "rented"),
-                "overdue_days": r.get("overdue_days"),
-                "created_at": r.get("created_at"),
-            })
-        out.sort(key=lambda x: x.get("start_date") or "", reverse=True)
+        vehicle_of = store.vehicles.get
+        no_vehicle = {}
+        out = [
+            _rental_row(r, vehicle_of(r.get("vehicle_id"), no_vehicle))
+            for r in store.rentals_for_user(renter_id)
+        ]
+        # Newest first; start_date is always a string in the rows, so the C itemgetter key is safe
+        out.sort(key=itemgetter("start_date"), reverse=True)
         return out
+
+
+def _rental_row(r: dict, v: dict) -> dict:
+    """Flatten one rental plus its vehicle into the dashboard row shape."""
+    return {
+        "rental_id": r.get("rental_id"),
+        "vehicle_id": r.get("vehicle_id"),
+        "brand": v.get("brand", ""),
+        "model": v.get("model", ""),
+        "type": v.get("type", ""),
+        "start_date": r.get("start_date") or "",
+        "end_date": r.get("end_date"),
+        "days": r.get("days"),
+        "rate": r.get("rate"),
+        "discount": r.get("discount"),
+        "total": r.get("total"),
+        "status": r.get("status", "rented"),
+        "overdue_days": r.get("overdue_days"),
+        "created_at": r.get("created_at"),
+    }
@@ -1,7 +1,15 @@
 from __future__ import annotations
+from datetime import date
+from math import inf
 from typing import List, Tuple, Optional, TYPE_CHECKING, Any
-from app.services.common import norm_type, to_float_safe, _today, _parse_date, _lc, _store
-from app.utils.constants import VehicleStatus, RentalStatus
+from app.services.common import (
+    norm_type, to_float_safe, _today, _lc, _store,
+    vehicle_rows, vehicle_rows_of_type, vehicle_rows_matching, vehicle_rentals, rental_ordinals, mark_dirty,
+    vehicle_label, store_lock,
+)
+from app.utils.constants import (
+    VehicleStatus, RentalStatus, ALLOWED_TYPES, ACTIVE_RENTAL_STATUSES, BUSY_VEHICLE_STATUSES,
+)
 
 if TYPE_CHECKING:
     # Only for type hints; won't execute at runtime
@@ -64,44 +72,44 @@ class VehicleService:
         """
         # 1. Resolve data source
         st = store or _store()
-        res = list(getattr(st, "vehicles", {}).values())
-
-        # 2. Type filter
-        if vtype:
-            vt = norm_type(vtype)
-            res = [v for v in res if norm_type(v.get("type")) == vt]
-
-        # 3. Brand/model filter (case-insensitive, partial match)
-        if brand:
-            kw = _lc(brand).strip()
-            if kw:
-                def match(v):
-                    b = _lc(v.get("brand") or "")
-                    m = _lc(v.get("model") or "")
-                    return (kw in b) or (kw in m)
-
-                res = [v for v in res if match(v)]
-
-        # 4. Price range filter (invalid min/max ignored)
-        min_val = to_float_safe(min_rate)
-        max_val = to_float_safe(max_rate)
-        if (min_val is not None) and (max_val is not None) and (min_val > max_val):
-            min_val, max_val = max_val, min_val
-
-        if (min_val is not None) or (max_val is not None):
-            def within(v):
-                r = to_float_safe(v.get("rate"))
-                if r is None:
-                    return False
-                if (min_val is not None) and (r < min_val):
-                    return False
-                if (max_val is not None) and (r > max_val):
-                    return False
-                return True
 
-            res = [v for v in res if within(v)]
+        # 2. Normalize every criterion once, outside the loop
+        vt = norm_type(vtype) if vtype else None
+        kw = _lc(brand).strip() if brand else ""
 
-        return res
+        # Price range (invalid min/max ignored; floats from the controller pass straight through)
+        min_val = min_rate if isinstance(min_rate, float) else to_float_safe(min_rate)
+        max_val = max_rate if isinstance(max_rate, float) else to_float_safe(max_rate)
+        if (min_val is not None) and (max_val is not None) and (min_val > max_val):
+            min_val, max_val = max_val, min_val
+        priced = (min_val is not None) or (max_val is not None)
+        lo = -inf if min_val is None else min_val
+        hi = inf if max_val is None else max_val
+
+        # 3. Start from the narrowest store index: brand/model keyword (case-insensitive, partial)
+        #    via the distinct-name index, else the exact per-type bucket, else every vehicle
+        check_type = False
+        if kw:
+            rows = vehicle_rows_matching(st, kw)
+            check_type = vt is not None
+        elif vt is not None:
+            rows = vehicle_rows_of_type(st, vt)
+        else:
+            rows = vehicle_rows(st)
+
+        # 4. One fused pass over the candidates for whatever the index did not cover
+        def keep(v):
+            if check_type and norm_type(v.get("type")) != vt:
+                return False
+            if priced:
+                # Stored rates are already floats (create/update coerce them); parse only legacy values
+                r = v.get("rate")
+                if r.__class__ is not float:
+                    r = to_float_safe(r)
+                return r is not None and lo <= r <= hi
+            return True
+
+        return [v for v in rows if keep(v)]
 
     @staticmethod
     def get_vehicle(vid: str):
@@ -125,7 +133,7 @@ class VehicleService:
         vtype = (payload.get("type") or "").lower().strip()
         rate = float(payload.get("rate") or 0)
 
-        if not brand or not model or vtype not in ("car", "motorbike", "truck"):
+        if not brand or not model or vtype not in ALLOWED_TYPES:
             return False, "Invalid vehicle data", None
 
         vid = st.create_vehicle({
@@ -134,7 +142,7 @@ class VehicleService:
             "type": vtype,
             "rate": rate,
             "status": "available",
-            "image_path": payload.get("image_path") or "/static/images/placeholder.png",
+            "image_path": (payload.get("image_path") or "").strip() or "/static/images/placeholder.png",
         })
 
         return True, "Vehicle created", vid
@@ -146,7 +154,7 @@ class VehicleService:
         - the vehicle exists,
         - the vehicle itself is not in an active state (rented/overdue),
         - there are no active rentals referencing this vehicle.
-        The persistence layer's `save()` is optional (no-op if missing).
+        Persistence is optional (no-op for stores without mark_dirty()/save()).
         """
         st = store or VehicleService._get_store()
 
@@ -155,31 +163,25 @@ class VehicleService:
             return False, "Vehicle not found"
 
         # Guard 1: vehicle status must not be active
-        active_vehicle_states = {"rented", "overdue"}
-        if (veh.get("status") or "").lower() in active_vehicle_states:
+        if (veh.get("status") or "").lower() in BUSY_VEHICLE_STATUSES:
             return False, f"Cannot delete while {veh.get('status')}"
 
-        # Guard 2: no active rentals referencing this vehicle
-        # Adjust the set if your project defines ACTIVE_RENTAL_STATES elsewhere.
-        active_rental_states = {"rented", "overdue"}
-        rentals = getattr(st, "rentals", {}) or {}
-        for r in rentals.values():
-            if r.get("vehicle_id") == vehicle_id and (r.get("status") or "").lower() in active_rental_states:
-                return False, "Cannot delete: active rentals exist"
+        # Guard 2: no active rentals referencing this vehicle (O(k) over its index bucket, stops at the first hit)
+        if any((r.get("status") or "").lower() in ACTIVE_RENTAL_STATUSES for r in vehicle_rentals(st, vehicle_id)):
+            return False, "Cannot delete: active rentals exist"
 
-        # Perform deletion
-        del st.vehicles[vehicle_id]
+        # Perform deletion under the store lock so it cannot race a background dump
+        with store_lock(st):
+            del st.vehicles[vehicle_id]
 
-        # Optional save: do nothing if the store has no save()
-        save = getattr(st, "save", None)
-        if callable(save):
-            save()
+        # Optional persistence: do nothing if the store has none
+        mark_dirty(st)
 
         return True, "Vehicle deleted"
 
     @staticmethod
     def all_vehicles():
-        return list(VehicleService._get_store().vehicles.values())
+        return list(vehicle_rows(VehicleService._get_store()))
 
     @staticmethod
     def availability_calendar(vehicle_id: str):
@@ -189,32 +191,57 @@ class VehicleService:
         """
         store = VehicleService._get_store()
         ranges: List[Tuple[str, str]] = []
-        for r in store.rentals.values():
-            if r.get("vehicle_id") != vehicle_id:
-                continue
-            if r.get("status") in (RentalStatus.RENTED, RentalStatus.OVERDUE):
+        for r in vehicle_rentals(store, vehicle_id):
+            if r.get("status") in ACTIVE_RENTAL_STATUSES:
                 ranges.append((r["start_date"], r["end_date"]))
         ranges.sort(key=lambda t: t[0])  # stable for UI
         return ranges
 
     @staticmethod
-    def refresh_overdue_flags():
+    def refresh_overdue_flags(today: Optional[date] = None):
         """
         If a rental end_date < today and status is still 'rented' -> mark rental 'overdue'
-        and set the vehicle to 'overdue'.
+        and set the vehicle to 'overdue'. `today` lets a request pass the date it already
+        resolved (views use g.today); defaults to the current date.
+        Runs at most once per day per store: rentals created later start today or after,
+        so they cannot become overdue before the date changes. Directly inserted rentals
+        change the count and trigger a new sweep. Only due rentals are visited (store heap),
+        and the store is persisted only when a flag changed.
         """
         store = VehicleService._get_store()
-        today = _today()
-
-        for rental in store.rentals.values():
-            if rental.get("status") == RentalStatus.RENTED:
-                end = _parse_date(rental["end_date"])
-                if end < today:
-                    rental["status"] = RentalStatus.OVERDUE
-                    vid = rental.get("vehicle_id")
-                    if vid in store.vehicles:
-                        store.vehicles[vid]["status"] = VehicleStatus.OVERDUE
-        store.save()
+        day = today or _today()
+        # (day, rental count) of the last completed sweep, kept on the store itself so a new
+        # store never inherits another's marker (an id() key could be reused after GC)
+        key = (day, len(store.rentals))
+        if getattr(store, "_overdue_checked", None) == key:
+            return
+
+        # Loop-invariant lookups bound once as locals
+        today = day.toordinal()
+        vehicles = store.vehicles
+        rented, overdue, vehicle_overdue = RentalStatus.RENTED, RentalStatus.OVERDUE, VehicleStatus.OVERDUE
+
+        # The store's end-day heap yields only the due rentals; fake stores get a full scan
+        pop_due = getattr(store, "pop_due_rentals", None)
+        if callable(pop_due):
+            due = pop_due(today)
+        else:
+            due = []
+            for rental in store.rentals.values():
+                if rental.get("status") != rented:
+                    continue
+                _, end = rental_ordinals(rental)
+                if end is not None and end < today:
+                    due.append(rental)
+
+        for rental in due:
+            rental["status"] = overdue
+            v = vehicles.get(rental.get("vehicle_id"))
+            if v is not None:
+                v["status"] = vehicle_overdue
+        if due:
+            mark_dirty(store)
+        store._overdue_checked = key
 
     @classmethod
     def staff_update_vehicle(cls, vehicle_id: str, data: dict, store=None):
@@ -255,6 +282,10 @@ class VehicleService:
 
                 v[k] = val
 
+        # Keep the stored display label in step with brand/model
+        if "brand" in data or "model" in data:
+            v["label"] = vehicle_label(v)
+
         # Persist changes
-        store.save()
+        mark_dirty(store)
         return True, f"Vehicle '{v.get('brand', '')} {v.get('model', '')}' updated successfully."
@@ -0,0 +1,62 @@
+"""HTTP conditional-GET and rendered-page caching helpers for read-mostly pages."""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import Response, make_response, render_template, request, session
+
+from .security import current_uid
+
+# Server-side LRU of rendered pages keyed by ETag (which embeds the store version,
+# page inputs and session identity); stale versions simply age out.
+_RENDER_CACHE_MAX = 64
+_render_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_render_lock = threading.Lock()
+
+
+def page_etag(*parts) -> str:
+    """
+    Build an ETag from the given parts plus the session identity.
+    Pages render the username/role in the navbar, so the identity is always part of the tag.
+    """
+    key = (current_uid(), session.get("role"), session.get("username")) + parts
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+def _cached_render(etag: str, template: str, build_context) -> Response:
+    """Serve rendered HTML from the LRU, rendering and storing it on a miss."""
+    with _render_lock:
+        body = _render_cache.get(etag)
+        if body is not None:
+            _render_cache.move_to_end(etag)
+    if body is None:
+        body = render_template(template, **build_context()).encode()
+        with _render_lock:
+            _render_cache[etag] = body
+            while len(_render_cache) > _RENDER_CACHE_MAX:
+                _render_cache.popitem(last=False)
+    return Response(body, mimetype="text/html")
+
+
+def conditional_render(template: str, etag_parts: tuple, build_context, server_cache: bool = False):
+    """
+    Answer 304 Not Modified when the client's If-None-Match matches, skipping both
+    `build_context()` and Jinja rendering; otherwise render and tag the response.
+    With `server_cache`, rendered bytes are also reused across clients with the same ETag.
+    Pages with pending flash messages are always rendered so the message is shown.
+    """
+    if session.get("_flashes"):
+        return render_template(template, **build_context())
+
+    etag = page_etag(*etag_parts)
+    if etag in request.if_none_match:
+        resp = Response(status=304)
+    elif server_cache:
+        resp = _cached_render(etag, template, build_context)
+    else:
+        resp = make_response(render_template(template, **build_context()))
+    resp.set_etag(etag)
+    # Per-user pages: browsers may keep them but must revalidate; shared caches must not
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    return resp
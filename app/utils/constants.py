@@ -15,6 +15,20 @@ class Role:
     STAFF = "staff"
 
 
+# Role groups for membership checks (frozensets: O(1) lookups, built once)
+ALL_ROLES = frozenset({Role.INDIVIDUAL, Role.CORPORATE, Role.STAFF})
+CUSTOMER_ROLES = frozenset({Role.INDIVIDUAL, Role.CORPORATE})
+
+
+# Dashboard endpoint per role (shared by login and post-action redirects)
+ROLE_DASHBOARDS = {
+    Role.STAFF: "views.staff_dashboard",
+    Role.CORPORATE: "views.corporate_dashboard",
+    Role.INDIVIDUAL: "views.individual_dashboard",
+}
+DEFAULT_DASHBOARD = ROLE_DASHBOARDS[Role.INDIVIDUAL]
+
+
 class RentalStatus:
     RENTED = "rented"
     OVERDUE = "overdue"
@@ -22,12 +36,21 @@ class RentalStatus:
     CANCELLED = "cancelled"
 
 
+# Rental status groups: active rentals block the vehicle, closed ones are final
+ACTIVE_RENTAL_STATUSES = frozenset({RentalStatus.RENTED, RentalStatus.OVERDUE})
+CLOSED_RENTAL_STATUSES = frozenset({RentalStatus.RETURNED, RentalStatus.CANCELLED})
+
+
 class VehicleStatus:
     AVAILABLE = "available"
     RENTED = "rented"
     OVERDUE = "overdue"
 
 
+# Vehicle statuses that block deletion
+BUSY_VEHICLE_STATUSES = frozenset({VehicleStatus.RENTED, VehicleStatus.OVERDUE})
+
+
 # --- Misc ---
-ALLOWED_TYPES = {"car", "motorbike", "truck"}
+ALLOWED_TYPES = frozenset({"car", "motorbike", "truck"})
 PLACEHOLDER = "/static/images/placeholder.png"
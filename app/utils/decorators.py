@@ -2,13 +2,15 @@ from functools import wraps
 
 from flask import session, redirect, url_for, flash
 
+from .urls import login_url
+
 
 def login_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         if "uid" not in session:
             flash("Please login first")
-            return redirect(url_for("auth.login_form"))
+            return redirect(login_url())
         return fn(*args, **kwargs)
 
     return wrapper
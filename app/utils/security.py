@@ -1,6 +1,12 @@
+from flask import session
 from werkzeug.security import generate_password_hash, check_password_hash
 
 
+def current_uid() -> str | None:
+    """Return the logged-in user's id; session["uid"] is the only copy kept in the cookie."""
+    return session.get("uid")
+
+
 def generate_hash(password: str) -> str:
     return generate_password_hash(password)
 
@@ -0,0 +1,26 @@
+"""Cached URLs for fixed redirect targets."""
+from flask import current_app, url_for
+
+from .constants import ROLE_DASHBOARDS, DEFAULT_DASHBOARD
+
+
+def dashboard_url(role: str | None) -> str:
+    """
+    Return the dashboard URL for a role (unknown roles get the default dashboard).
+    The URLs are built with url_for() on first use and cached per app in
+    app.config["DASHBOARD_URLS"], so later redirects skip werkzeug URL building.
+    """
+    urls = current_app.config.get("DASHBOARD_URLS")
+    if urls is None:
+        urls = {r: url_for(endpoint) for r, endpoint in ROLE_DASHBOARDS.items()}
+        urls[None] = url_for(DEFAULT_DASHBOARD)
+        current_app.config["DASHBOARD_URLS"] = urls
+    return urls.get(role) or urls[None]
+
+
+def login_url() -> str:
+    """Return the login page URL, built once per app and cached in app.config["LOGIN_URL"]."""
+    url = current_app.config.get("LOGIN_URL")
+    if url is None:
+        url = current_app.config["LOGIN_URL"] = url_for("auth.login_form")
+    return url
@@ -63,6 +63,26 @@ def unified_store(monkeypatch):
     yield store
 
 
+@pytest.fixture
+def tmp_store(tmp_path):
+    """A real Store persisted under the test's tmp_path (indexes, version, writer)."""
+    from app.models.store import Store
+    return Store(tmp_path / "data.pkl")
+
+
+@pytest.fixture
+def tmp_store_as_instance(tmp_store, monkeypatch):
+    """Serve tmp_store from Store.instance() (e.g. to AnalyticsService)."""
+    monkeypatch.setattr("app.models.store.Store.instance", lambda: tmp_store)
+
+
+@pytest.fixture
+def tmp_store_in_vehicle_service(tmp_store, monkeypatch):
+    """Inject tmp_store through VehicleService's test hook (VehicleService.store)."""
+    from app.services.vehicle_service import VehicleService
+    monkeypatch.setattr(VehicleService, "store", tmp_store)
+
+
 @pytest.fixture
 def client():
     """
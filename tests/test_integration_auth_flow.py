@@ -8,10 +8,10 @@ import pytest
 
 def _get_session_user_id(client):
     """
-    Try to read a login marker from the session. Works for Flask-Login or custom session keys.
+    Read the login marker from the session (the app keeps a single canonical "uid" key).
     """
     with client.session_transaction() as sess:
-        return sess.get("user_id") or sess.get("_user_id")
+        return sess.get("uid")
 
 
 def _register(client, username, password, role="individual", follow=True):
@@ -123,3 +123,50 @@ def test_logout_revokes_access(client, clean_store):
 
     r = client.get("/staff/vehicles", follow_redirects=False)
     assert r.status_code in (302, 401, 403)
+
+
+def test_repeat_login_uses_cache_but_still_rejects_wrong_password(client, clean_store):
+    """
+    A second login with the same credentials should succeed (served from the verify cache),
+    while a wrong password must still be rejected after a cached success.
+    """
+    from app.services.user_service import UserService
+    ok, msg = UserService.admin_create_user("staff_test", "staff", "Adminpw1")
+    assert ok, msg
+
+    for _ in range(2):
+        _login(client, "staff_test", "Adminpw1")
+        assert _get_session_user_id(client)
+        _logout(client)
+
+    _login(client, "staff_test", "Adminpw2")
+    assert not _get_session_user_id(client)
+
+
+def test_verify_cache_skips_kdf_on_repeat_and_misses_on_new_hash(monkeypatch):
+    """
+    Two verifications of the same credentials run the password KDF once; a changed
+    stored hash (password reset / re-created user) must miss the cache and re-check.
+    """
+    from werkzeug.security import generate_password_hash
+    from app.controllers import auth
+    from app.utils import security
+
+    monkeypatch.setattr(auth, "_verify_cache", type(auth._verify_cache)())
+    calls = []
+    real_check = security.check_password_hash
+
+    def counting_check(hashed, password):
+        calls.append(hashed)
+        return real_check(hashed, password)
+
+    monkeypatch.setattr(security, "check_password_hash", counting_check)
+
+    user = {"renter_id": "u1", "password_hash": generate_password_hash("Adminpw1")}
+    assert auth._verify_password("cache_user", "Adminpw1", user)
+    assert auth._verify_password("cache_user", "Adminpw1", user)
+    assert len(calls) == 1
+
+    rehashed = dict(user, password_hash=generate_password_hash("Adminpw1"))
+    assert auth._verify_password("cache_user", "Adminpw1", rehashed)
+    assert len(calls) == 2 and calls[-1] == rehashed["password_hash"]
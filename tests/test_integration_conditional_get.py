@@ -0,0 +1,65 @@
+"""
+Conditional GET on read-mostly pages: a repeat request with the ETag returns 304,
+and any store write changes the ETag so the page is rendered again.
+"""
+
+
+def _login_staff(client):
+    from app.services.user_service import UserService
+    ok, msg = UserService.admin_create_user("etag_staff", "staff", "Adminpw1")
+    assert ok, msg
+    client.post("/login", data={"username": "etag_staff", "password": "Adminpw1"})
+
+
+def test_vehicles_page_returns_304_until_store_changes(client):
+    from app.models.store import Store
+    _login_staff(client)
+
+    r1 = client.get("/vehicles")
+    assert r1.status_code == 200
+    etag = r1.headers.get("ETag")
+    assert etag
+
+    r2 = client.get("/vehicles", headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+
+    Store.instance().create_vehicle({"brand": "Honda", "model": "Fit", "type": "car", "rate": 40})
+    r3 = client.get("/vehicles", headers={"If-None-Match": etag})
+    assert r3.status_code == 200
+    assert r3.headers.get("ETag") != etag
+
+
+def test_etag_differs_per_filter(client):
+    _login_staff(client)
+    a = client.get("/vehicles?type=car").headers.get("ETag")
+    b = client.get("/vehicles?type=truck").headers.get("ETag")
+    assert a and b and a != b
+
+
+def test_vehicles_page_served_from_render_cache(client, monkeypatch):
+    from app.controllers import rentals as rentals_ctrl
+    _login_staff(client)
+
+    first = client.get("/vehicles?type=car")
+    assert first.status_code == 200
+
+    # A cache hit must not query the service again
+    def boom(*a, **kw):
+        raise AssertionError("filter_vehicles called on a cached page")
+
+    monkeypatch.setattr(rentals_ctrl.VehicleService, "filter_vehicles", boom)
+    again = client.get("/vehicles?type=car")
+    assert again.status_code == 200
+    assert again.data == first.data
+
+
+def test_cached_vehicles_page_echoes_normalized_filters(client):
+    _login_staff(client)
+
+    padded = client.get("/vehicles?brand=%20toyota")
+    assert b'value="toyota"' in padded.data
+
+    # Same normalized key: the cached page must not carry the first request's raw spacing
+    plain = client.get("/vehicles?brand=toyota")
+    assert plain.data == padded.data
+    assert b'value=" toyota"' not in plain.data
@@ -0,0 +1,62 @@
+"""
+Staff analytics: aggregated totals/groupings, and the memoized payload is refreshed
+as soon as the store changes.
+"""
+
+import pytest
+
+pytestmark = pytest.mark.usefixtures("tmp_store_as_instance")
+
+
+def test_analytics_aggregates_rentals(tmp_store):
+    from app.services.analytics_service import AnalyticsService
+
+    vid = tmp_store.create_vehicle({"brand": "Toyota", "model": "Corolla", "type": "car", "rate": 50})
+    tmp_store.create_rental({"vehicle_id": vid, "start_date": "2030-11-01", "end_date": "2030-11-02", "total": 50.0})
+    tmp_store.create_rental({"vehicle_id": vid, "start_date": "2030-11-01", "end_date": "2030-11-03", "total": 100.0})
+
+    data = AnalyticsService.analytics()
+    assert data["totals"]["rentals"] == 2
+    assert data["totals"]["revenue"] == 150.0
+    assert data["rentals_by_vehicle"] == [{"vehicle_id": vid, "label": "Toyota Corolla", "count": 2}]
+    assert data["revenue_by_date"] == [{"date": "2030-11-01", "total": 150.0}]
+
+
+def test_analytics_cache_invalidated_by_writes(tmp_store):
+    from app.services.analytics_service import AnalyticsService
+
+    first = AnalyticsService.analytics()
+    assert AnalyticsService.analytics() is first
+
+    tmp_store.create_vehicle({"brand": "Honda", "model": "Fit", "type": "car", "rate": 40})
+    second = AnalyticsService.analytics()
+    assert second is not first
+    assert second["totals"]["vehicles"] == first["totals"]["vehicles"] + 1
+
+
+def test_analytics_summary_top_and_bottom(tmp_store):
+    from app.services.analytics_service import AnalyticsService
+
+    for vid, n in (("a", 3), ("b", 1), ("c", 2)):
+        for _ in range(n):
+            tmp_store.create_rental({"vehicle_id": vid, "total": 10.0})
+
+    summary = AnalyticsService.analytics_summary()
+    assert summary["most_rented"][0] == ("a", 3)
+    assert summary["least_rented"][0] == ("b", 1)
+    assert summary["revenue"] == 60.0
+    assert AnalyticsService.analytics_summary() is summary
+
+
+def test_vehicle_label_stored_and_refreshed_on_update(tmp_store):
+    from app.services.vehicle_service import VehicleService
+
+    store = tmp_store
+    vid = store.create_vehicle({"brand": "Toyota", "model": "Corolla", "type": "car", "rate": 55})
+    assert store.vehicles[vid]["label"] == "Toyota Corolla"
+
+    store.update_vehicle(vid, model="Yaris")
+    assert store.vehicles[vid]["label"] == "Toyota Yaris"
+
+    ok, _ = VehicleService.staff_update_vehicle(vid, {"brand": "Honda", "model": ""}, store=store)
+    assert ok and store.vehicles[vid]["label"] == "Honda"
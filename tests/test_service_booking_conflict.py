@@ -80,3 +80,41 @@ def test_non_overlapping_booking_succeeds(fake_store):
     r0 = list(fake_store.rentals.values())[0]
     assert r0["start_date"] == "2030-11-01"
     assert r0["end_date"] == "2030-11-05"
+
+
+def test_conflict_with_long_earlier_booking_and_back_to_back_allowed(fake_store):
+    """
+    A long booking that starts before shorter ones must still block a window it covers,
+    while a booking starting exactly on an end date (end is exclusive) is allowed.
+    """
+    from app.services.rental_service import RentalService
+
+    vid = seed_vehicle(fake_store)
+    seed_rental(fake_store, rid=1, vehicle_id=vid, status="rented", start="2030-11-01", end="2030-11-20")
+    seed_rental(fake_store, rid=2, vehicle_id=vid, status="rented", start="2030-11-02", end="2030-11-03")
+    seed_rental(fake_store, rid=3, vehicle_id=vid, status="returned", start="2030-11-20", end="2030-11-25")
+
+    ok, _, _ = RentalService.rent(renter_id="u2", vehicle_id=vid,
+                                  start="2030-11-10", end="2030-11-12", store=fake_store)
+    assert not ok
+
+    ok, _, rid = RentalService.rent(renter_id="u2", vehicle_id=vid,
+                                    start="2030-11-20", end="2030-11-22", store=fake_store)
+    assert ok and rid
+
+
+@pytest.mark.parametrize("role, start, end, discount, total", [
+    ("corporate", "2030-12-01", "2030-12-03", 0.15, 68.0),
+    ("individual", "2030-12-01", "2030-12-07", 0.0, 240.0),
+    ("individual", "2030-12-01", "2030-12-08", 0.10, 252.0),
+    ("staff", "2030-12-01", "2030-12-03", 0.0, 80.0),
+])
+def test_rent_applies_role_discount(fake_store, role, start, end, discount, total):
+    from app.services.rental_service import RentalService
+
+    vid = seed_vehicle(fake_store)
+    fake_store.users["u9"] = {"renter_id": "u9", "username": "pat", "role": role}
+
+    ok, _, rid = RentalService.rent(renter_id="u9", vehicle_id=vid, start=start, end=end, store=fake_store)
+    assert ok
+    assert (fake_store.rentals[rid]["discount"], fake_store.rentals[rid]["total"]) == (discount, total)
@@ -0,0 +1,67 @@
+"""
+Overdue sweep: past-due 'rented' rentals become 'overdue' (vehicle too), and the sweep
+runs at most once per day unless new rentals appear.
+"""
+
+import pytest
+
+pytestmark = pytest.mark.usefixtures("tmp_store_in_vehicle_service")
+
+
+def test_refresh_marks_past_due_rentals_once_per_day(tmp_store):
+    from app.services.vehicle_service import VehicleService
+
+    vid = tmp_store.create_vehicle({"brand": "Honda", "model": "Fit", "type": "car", "rate": 40, "status": "rented"})
+    rid = tmp_store.create_rental({"vehicle_id": vid, "status": "rented",
+                                   "start_date": "2020-01-01", "end_date": "2020-01-05"})
+
+    VehicleService.refresh_overdue_flags()
+    assert tmp_store.rentals[rid]["status"] == "overdue"
+    assert tmp_store.vehicles[vid]["status"] == "overdue"
+
+    # Nothing changed since the sweep: no re-scan, no write
+    version = tmp_store.version
+    VehicleService.refresh_overdue_flags()
+    assert tmp_store.version == version
+
+    # A directly inserted past-due rental triggers a new sweep the same day
+    tmp_store.rentals["late"] = {"vehicle_id": vid, "status": "rented",
+                                 "start_date": "2020-02-01", "end_date": "2020-02-03"}
+    VehicleService.refresh_overdue_flags()
+    assert tmp_store.rentals["late"]["status"] == "overdue"
+
+
+def test_new_store_with_same_rental_count_is_still_swept(tmp_path, monkeypatch):
+    from app.models.store import Store
+    from app.services.vehicle_service import VehicleService
+
+    def seeded(name):
+        store = Store(tmp_path / name)
+        store.rentals["r1"] = {"vehicle_id": "v1", "status": "rented",
+                               "start_date": "2020-01-01", "end_date": "2020-01-05"}
+        monkeypatch.setattr(VehicleService, "store", store)
+        return store
+
+    seeded("a.pkl")
+    VehicleService.refresh_overdue_flags()
+
+    second = seeded("b.pkl")
+    VehicleService.refresh_overdue_flags()
+    assert second.rentals["r1"]["status"] == "overdue"
+
+
+def test_sweep_works_on_plain_store_without_persistence(monkeypatch):
+    from app.services.vehicle_service import VehicleService
+
+    class PlainStore:
+        def __init__(self):
+            self.users = {}
+            self.vehicles = {"v1": {"vehicle_id": "v1", "status": "rented"}}
+            self.rentals = {"r1": {"vehicle_id": "v1", "status": "rented",
+                                   "start_date": "2020-01-01", "end_date": "2020-01-05"}}
+
+    store = PlainStore()
+    monkeypatch.setattr(VehicleService, "store", store)
+    VehicleService.refresh_overdue_flags()
+    assert store.rentals["r1"]["status"] == "overdue"
+    assert store.vehicles["v1"]["status"] == "overdue"
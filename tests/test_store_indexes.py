@@ -0,0 +1,159 @@
+"""
+Store secondary indexes: rentals looked up by vehicle must match a full scan,
+including rentals that were seeded directly into the dict (bypassing create_rental).
+"""
+
+
+def test_rentals_for_vehicle_tracks_create_rental(tmp_store):
+    r1 = tmp_store.create_rental({"vehicle_id": "v1", "renter_id": "u1", "status": "rented"})
+    r2 = tmp_store.create_rental({"vehicle_id": "v2", "renter_id": "u1", "status": "rented"})
+    r3 = tmp_store.create_rental({"vehicle_id": "v1", "renter_id": "u2", "status": "returned"})
+
+    assert [r["rental_id"] for r in tmp_store.rentals_for_vehicle("v1")] == [r1, r3]
+    assert [r["rental_id"] for r in tmp_store.rentals_for_vehicle("v2")] == [r2]
+    assert tmp_store.rentals_for_vehicle("missing") == []
+
+
+def test_rentals_for_vehicle_resyncs_after_direct_seeding(tmp_store):
+    tmp_store.rentals[1] = {"vehicle_id": 7, "renter_id": "u1", "status": "rented"}
+    assert tmp_store.rentals_for_vehicle(7) == [tmp_store.rentals[1]]
+
+
+def test_vehicle_snapshot_refreshes_after_writes(tmp_store):
+    assert tmp_store.vehicle_snapshot() == ()
+    vid = tmp_store.create_vehicle({"brand": "Toyota", "model": "Corolla", "type": "car", "rate": 55})
+    snap = tmp_store.vehicle_snapshot()
+    assert isinstance(snap, tuple) and [v["vehicle_id"] for v in snap] == [vid]
+
+    tmp_store.vehicles["x"] = {"vehicle_id": "x", "brand": "Honda", "model": "Fit", "type": "car", "rate": 40}
+    assert {v["vehicle_id"] for v in tmp_store.vehicle_snapshot()} == {vid, "x"}
+
+
+def test_rentals_for_user_tracks_create_rental(tmp_store):
+    r1 = tmp_store.create_rental({"vehicle_id": "v1", "renter_id": "u1", "status": "rented"})
+    r2 = tmp_store.create_rental({"vehicle_id": "v2", "renter_id": "u2", "status": "rented"})
+    r3 = tmp_store.create_rental({"vehicle_id": "v2", "renter_id": "u1", "status": "returned"})
+
+    assert [r["rental_id"] for r in tmp_store.rentals_for_user("u1")] == [r1, r3]
+    assert [r["rental_id"] for r in tmp_store.rentals_for_user("u2")] == [r2]
+
+
+def test_indexes_rebuild_after_clear_and_reseed(tmp_store):
+    tmp_store.create_rental({"vehicle_id": "v1", "renter_id": "u1", "status": "rented"})
+    tmp_store.rentals.clear()
+    tmp_store.rentals["r9"] = {"rental_id": "r9", "vehicle_id": "v1", "renter_id": "u3", "status": "rented"}
+
+    assert tmp_store.rentals_for_vehicle("v1") == [tmp_store.rentals["r9"]]
+    assert tmp_store.rentals_for_user("u3") == [tmp_store.rentals["r9"]]
+
+
+def test_rental_day_ordinals_stored_and_backfilled_on_load(tmp_path):
+    import pickle
+    from datetime import date
+    from app.models.store import Store
+
+    path = tmp_path / "data.pkl"
+    legacy = {"r1": {"rental_id": "r1", "vehicle_id": "v1", "start_date": "2030-11-01", "end_date": "2030-11-05"}}
+    path.write_bytes(pickle.dumps({"users": {}, "vehicles": {}, "rentals": legacy}))
+
+    store = Store(path)
+    r1 = store.rentals["r1"]
+    assert (r1["start_ord"], r1["end_ord"]) == (date(2030, 11, 1).toordinal(), date(2030, 11, 5).toordinal())
+
+    rid = store.create_rental({"vehicle_id": "v1", "start_date": "2031-01-02", "end_date": "2031-01-03"})
+    assert store.rentals[rid]["end_ord"] == date(2031, 1, 3).toordinal()
+
+
+def test_vehicles_of_type_follows_updates(tmp_store):
+    car = tmp_store.create_vehicle({"brand": "Toyota", "model": "Corolla", "type": "car", "rate": 55})
+    bike = tmp_store.create_vehicle({"brand": "Yamaha", "model": "MT-07", "type": "motorbike", "rate": 40})
+
+    assert [v["vehicle_id"] for v in tmp_store.vehicles_of_type("car")] == [car]
+    assert tmp_store.vehicles_of_type("truck") == ()
+
+    tmp_store.update_vehicle(bike, type="car")
+    assert {v["vehicle_id"] for v in tmp_store.vehicles_of_type("car")} == {car, bike}
+
+
+def test_pop_due_rentals_returns_only_past_due_rented(tmp_store):
+    from datetime import date
+
+    due = tmp_store.create_rental({"vehicle_id": "v1", "status": "rented",
+                                   "start_date": "2020-01-01", "end_date": "2020-01-05"})
+    tmp_store.create_rental({"vehicle_id": "v2", "status": "rented",
+                             "start_date": "2099-01-01", "end_date": "2099-01-05"})
+    returned = tmp_store.create_rental({"vehicle_id": "v3", "status": "rented",
+                                        "start_date": "2020-02-01", "end_date": "2020-02-05"})
+    tmp_store.rentals[returned]["status"] = "returned"
+
+    today = date.today().toordinal()
+    assert [r["rental_id"] for r in tmp_store.pop_due_rentals(today)] == [due]
+    assert tmp_store.pop_due_rentals(today) == []
+
+
+def test_vehicles_matching_brand_or_model_substring_in_order(tmp_store):
+    a = tmp_store.create_vehicle({"brand": "Toyota", "model": "Corolla", "type": "car", "rate": 55})
+    b = tmp_store.create_vehicle({"brand": "Honda", "model": "Civic", "type": "car", "rate": 50})
+    c = tmp_store.create_vehicle({"brand": "Toyota", "model": "Hilux", "type": "truck", "rate": 90})
+
+    assert [v["vehicle_id"] for v in tmp_store.vehicles_matching("toyota")] == [a, c]
+    assert [v["vehicle_id"] for v in tmp_store.vehicles_matching("o")] == [a, b, c]
+    assert [v["vehicle_id"] for v in tmp_store.vehicles_matching("civ")] == [b]
+    assert tmp_store.vehicles_matching("tesla") == ()
+
+
+def test_username_index_tracks_create_delete_and_seeding(tmp_store):
+    uid = tmp_store.create_user("alice", "h", "individual")
+    assert tmp_store.find_user("alice")["renter_id"] == uid
+    assert tmp_store.user_exists("alice") and not tmp_store.user_exists("bob")
+
+    tmp_store.users["u9"] = {"renter_id": "u9", "username": "bob", "password_hash": "h", "role": "corporate"}
+    assert tmp_store.find_user("bob") is tmp_store.users["u9"]
+
+    assert tmp_store.delete_user(uid)
+    assert tmp_store.find_user("alice") is None and not tmp_store.user_exists("alice")
+
+
+def test_active_intervals_cached_until_store_changes(tmp_store, monkeypatch):
+    from datetime import date
+
+    rid = tmp_store.create_rental({"vehicle_id": "v1", "status": "rented",
+                                   "start_date": "2030-11-01", "end_date": "2030-11-05"})
+    starts, _ = tmp_store.active_intervals("v1")
+    assert starts == [date(2030, 11, 1).toordinal()]
+
+    # A cache hit does not touch the vehicle's rentals at all
+    monkeypatch.setattr(tmp_store, "rentals_for_vehicle", lambda vid: 1 / 0)
+    assert tmp_store.active_intervals("v1")[0] == starts
+    monkeypatch.undo()
+
+    tmp_store.rentals[rid]["status"] = "returned"
+    tmp_store.mark_dirty()
+    assert tmp_store.active_intervals("v1") == ([], [])
+
+
+def test_update_rental_dates_recompute_ordinals_for_booking_and_overdue(tmp_store):
+    from datetime import date, timedelta
+    from app.services.rental_service import RentalService
+
+    def day(n):
+        return (date.today() + timedelta(days=n)).isoformat()
+
+    vid = tmp_store.create_vehicle({"brand": "Honda", "model": "Fit", "type": "car", "rate": 40})
+
+    ok, _, rid = RentalService.rent("u1", vid, day(1), day(3), store=tmp_store)
+    assert ok
+    assert tmp_store.update_rental(rid, {"start_date": day(10), "end_date": day(12)})
+    assert tmp_store.rentals[rid]["end_ord"] == (date.today() + timedelta(days=12)).toordinal()
+
+    # The old window is free again and the new one is booked
+    assert RentalService.rent("u2", vid, day(1), day(3), store=tmp_store)[0]
+    assert not RentalService.rent("u2", vid, day(11), day(13), store=tmp_store)[0]
+
+    # Moving the end into the past re-queues it for the overdue sweep exactly once
+    tmp_store.update_rental(rid, {"start_date": "2020-01-01", "end_date": "2020-01-05"})
+    assert [r["rental_id"] for r in tmp_store.pop_due_rentals(date.today().toordinal())] == [rid]
+
+    # Reassigning the vehicle rebuilds the rental indexes
+    tmp_store.update_rental(rid, {"vehicle_id": "v-other"})
+    assert [r["rental_id"] for r in tmp_store.rentals_for_vehicle("v-other")] == [rid]
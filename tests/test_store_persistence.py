@@ -0,0 +1,120 @@
+"""
+Store persistence: writes are coalesced by the background writer, and flush() makes
+pending changes durable so a fresh Store sees them.
+"""
+
+
+def test_mutations_mark_dirty_and_flush_persists(tmp_path):
+    from app.models.store import Store
+
+    path = tmp_path / "data.pkl"
+    store = Store(path)
+    version = store.version
+
+    vid = store.create_vehicle({"brand": "Toyota", "model": "Corolla", "type": "car", "rate": 55})
+    assert store.version == version + 1
+    assert store._dirty
+
+    store.flush()
+    assert not store._dirty
+    assert vid in Store(path).vehicles
+
+
+def test_background_writer_flushes_pending_stores(tmp_path):
+    from app.models import store as store_mod
+
+    store = store_mod.Store(tmp_path / "data.pkl")
+    rid = store.create_rental({"vehicle_id": "v1", "start_date": "2030-11-01", "end_date": "2030-11-02"})
+
+    store_mod._writer.flush_all()
+    assert not store._dirty
+    assert rid in store_mod.Store(tmp_path / "data.pkl").rentals
+
+
+def test_load_interns_status_role_and_type(tmp_path):
+    import pickle
+    import sys
+    from app.models.store import Store
+    from app.utils.constants import RentalStatus, Role
+
+    path = tmp_path / "data.pkl"
+    fresh = "".join(["rent", "ed"])  # built at runtime, so not the interned literal
+    path.write_bytes(pickle.dumps({
+        "users": {"u1": {"renter_id": "u1", "username": "amy", "role": "".join(["indiv", "idual"])}},
+        "vehicles": {"v1": {"vehicle_id": "v1", "type": "".join(["c", "ar"]), "status": "available"}},
+        "rentals": {"r1": {"rental_id": "r1", "vehicle_id": "v1", "status": fresh}},
+    }))
+
+    store = Store(path)
+    assert store.rentals["r1"]["status"] is RentalStatus.RENTED
+    assert store.vehicles["v1"]["type"] is sys.intern("car")
+    assert store.users["u1"]["role"] is Role.INDIVIDUAL
+
+
+def test_exit_flush_waits_for_in_flight_background_dump(tmp_path, monkeypatch):
+    import threading
+    import time
+    from app.models import store as store_mod
+
+    path = tmp_path / "data.pkl"
+    store = store_mod.Store(path)
+    rid = store.create_rental({"vehicle_id": "v1", "start_date": "2030-11-01", "end_date": "2030-11-02"})
+
+    real_dump = store_mod.pickle.dump
+
+    def slow_dump(*args, **kwargs):
+        time.sleep(0.3)
+        real_dump(*args, **kwargs)
+
+    monkeypatch.setattr(store_mod.pickle, "dump", slow_dump)
+    writer = threading.Thread(target=store_mod._writer.flush_all)
+    writer.start()
+    time.sleep(0.05)  # the writer thread is now inside _dump with _dirty already cleared
+
+    store_mod._writer.flush_dirty()
+    assert rid in store_mod.Store(path).rentals
+    assert not (tmp_path / "data.pkl.tmp").exists()
+    writer.join()
+
+
+def test_failed_background_save_stays_pending_and_is_retried(tmp_path, monkeypatch):
+    from app.models import store as store_mod
+
+    store = store_mod.Store(tmp_path / "data.pkl")
+    vid = store.create_vehicle({"brand": "Toyota", "model": "Corolla", "type": "car", "rate": 55})
+
+    real_dump = store._dump
+    calls = []
+
+    def failing_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        real_dump()
+
+    monkeypatch.setattr(store, "_dump", failing_once)
+    store_mod._writer.flush_all()
+    assert store._dirty and store in store_mod._writer._pending
+
+    store_mod._writer.flush_all()
+    assert not store._dirty
+    assert vid in store_mod.Store(tmp_path / "data.pkl").vehicles
+
+
+def test_concurrent_mark_dirty_never_loses_a_version_bump(tmp_path):
+    import threading
+    from app.models.store import Store
+
+    store = Store(tmp_path / "data.pkl")
+    start = store.version
+
+    def bump():
+        for _ in range(2000):
+            store.mark_dirty()
+
+    threads = [threading.Thread(target=bump) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.version == start + 8 * 2000